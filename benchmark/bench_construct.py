@@ -0,0 +1,36 @@
+"""可信数据跳过校验(model_construct)与完整校验(model_validate)的开销对比
+
+python -m benchmark.bench_construct
+
+pydantic v2 的校验在 pydantic-core 中完成，而 model_construct 逐字段在 python 中处理，
+即使不转换嵌套模型和时间字段(结果并不可用)也不比完整校验快，因此没有提供跳过校验的可信模式。
+仓库内没有真实的抓包数据，这里沿用 bench_json 构造的数据，时间字段为 socketio 解包后的毫秒时间戳
+"""
+
+from timeit import timeit
+
+from nonebot_adapter_tailchat.event import MessageAddEvent
+from nonebot_adapter_tailchat.model import MessageRet
+
+from .bench_json import message, object_id
+
+TIMESTAMPS = {"createdAt": 1724414400000, "updatedAt": 1724414400000}
+
+PAYLOADS = {
+    "notify:chat.message.add": (
+        MessageAddEvent,
+        dict(message(1), **TIMESTAMPS, event_name="notify:chat.message.add", self_id=object_id(1)),
+        20000,
+    ),
+    "MessageRet": (MessageRet, dict(message(1), **TIMESTAMPS), 20000),
+}
+
+
+if __name__ == "__main__":
+    for name, (model, payload, number) in PAYLOADS.items():
+        print(name)
+        base = timeit(lambda: model.model_validate(payload), number=number) / number * 1e6
+        print(f"  {'model_validate':<28} {base:>10.1f}us")
+        # 嵌套模型仍为 dict，时间仍为 int，只是跳过校验的下限
+        cost = timeit(lambda: model.model_construct(**payload), number=number) / number * 1e6
+        print(f"  {'model_construct (flat)':<28} {cost:>10.1f}us  x{base / cost:.2f}")
@@ -0,0 +1,69 @@
+"""http 响应 json 解码开销对比
+
+python -m benchmark.bench_json
+
+仓库内没有真实的抓包数据，这里按 fetchConverseMessage / getUserGroups 的响应结构构造数据
+"""
+
+from timeit import timeit
+
+from nonebot_adapter_tailchat.codec import CODECS
+
+
+def object_id(i: int) -> str:
+    return f"66c8a1f0e2b1a2c3{i:08x}"
+
+
+def message(i: int) -> dict:
+    return {
+        "_id": object_id(i),
+        "content": f"[b]第 {i} 条消息[/b] [at={object_id(1)}]eya46[/at] hello tailchat " * 3,
+        "author": object_id(i % 7),
+        "converseId": object_id(100),
+        "groupId": object_id(200),
+        "hasRecall": False,
+        "reactions": [{"name": ":smirk:", "author": object_id(j)} for j in range(i % 4)],
+        "createdAt": "2024-08-23T12:00:00.000Z",
+        "updatedAt": "2024-08-23T12:00:00.000Z",
+        "meta": {"mentions": [object_id(1)]},
+        "__v": 0,
+    }
+
+
+def group(i: int) -> dict:
+    return {
+        "_id": object_id(1000 + i),
+        "name": f"group {i}",
+        "owner": object_id(1),
+        "members": [{"roles": [], "userId": object_id(j)} for j in range(200)],
+        "panels": [{"id": object_id(j), "name": f"panel {j}", "type": 0, "fallbackPermissions": []} for j in range(10)],
+        "roles": [{"_id": object_id(j), "name": "admin", "permissions": ["core.message"]} for j in range(3)],
+        "fallbackPermissions": ["core.message"],
+        "createdAt": "2024-08-23T12:00:00.000Z",
+        "updatedAt": "2024-08-23T12:00:00.000Z",
+        "__v": 0,
+    }
+
+
+PAYLOADS = {
+    "fetchConverseMessage": {"code": 200, "data": [message(i) for i in range(50)]},
+    "getUserGroups": {"code": 200, "data": [group(i) for i in range(20)]},
+}
+
+
+if __name__ == "__main__":
+    stdlib = CODECS["json"]()
+    for name, payload in PAYLOADS.items():
+        raw = stdlib.dumps(payload)
+        print(f"{name} ({len(raw) / 1024:.1f} KiB)")
+        base = timeit(lambda: stdlib.loads(raw.decode()), number=200) / 200 * 1e6
+        print(f"  {'json (decode + loads)':<24} {base:>10.1f}us")
+        for codec_name, factory in CODECS.items():
+            try:
+                codec = factory()
+            except ImportError:
+                print(f"  {codec_name:<24} {'not installed':>12}")
+                continue
+            assert codec.loads(raw) == payload
+            cost = timeit(lambda: codec.loads(raw), number=200) / 200 * 1e6
+            print(f"  {codec_name:<24} {cost:>10.1f}us  x{base / cost:.1f}")
@@ -0,0 +1,75 @@
+"""socketio msgpack 解包 + 模型校验开销对比
+
+python -m benchmark.bench_msgpack
+
+仓库内没有真实的抓包数据，这里沿用 bench_json 构造的消息/群组数据，
+时间字段与 tailchat 一样编码为 msgpack ext 类型 0
+"""
+
+from datetime import datetime
+from timeit import timeit
+from typing import Annotated
+
+from msgpack import ExtType
+from pydantic import BeforeValidator, TypeAdapter
+from socketio.msgpack_packet import MsgPackPacket as BaseMsgPackPacket
+
+from nonebot_adapter_tailchat.codec import MsgPackPacket
+from nonebot_adapter_tailchat.model import GroupInfo, MessageRet
+from nonebot_adapter_tailchat.util import unpack
+
+from .bench_json import group, message
+
+# 改动前: 解包后保留 ExtType，由 BeforeValidator(unpack) 在校验时逐个字段转换
+LegacyDatetime = Annotated[datetime, BeforeValidator(unpack)]
+
+
+class LegacyMessageRet(MessageRet):
+    createdAt: LegacyDatetime
+    updatedAt: LegacyDatetime
+
+
+class LegacyGroupInfo(GroupInfo):
+    createdAt: LegacyDatetime
+    updatedAt: LegacyDatetime
+
+
+def with_ext(data):
+    if isinstance(data, dict):
+        return {
+            key: ExtType(0, (1724414400000).to_bytes(8, "big"))
+            if key in ("createdAt", "updatedAt")
+            else with_ext(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [with_ext(i) for i in data]
+    return data
+
+
+PAYLOADS = {
+    "notify:chat.message.add": (LegacyMessageRet, MessageRet, with_ext(message(1)), 5000),
+    "group.getUserGroups": (list[LegacyGroupInfo], list[GroupInfo], with_ext([group(i) for i in range(20)]), 200),
+}
+
+
+if __name__ == "__main__":
+    for name, (legacy, model, payload, number) in PAYLOADS.items():
+        legacy_adapter, adapter = TypeAdapter(legacy), TypeAdapter(model)
+        encoded = BaseMsgPackPacket(data=[name, payload]).encode()
+        assert legacy_adapter.validate_python(
+            BaseMsgPackPacket(encoded_packet=encoded).data[1]
+        ) == legacy_adapter.validate_python(MsgPackPacket(encoded_packet=encoded).data[1])
+        print(f"{name} ({len(encoded) / 1024:.1f} KiB)")
+        for label, packet, type_adapter in (
+            ("ExtType + BeforeValidator", BaseMsgPackPacket, legacy_adapter),
+            ("ext_hook", MsgPackPacket, adapter),
+        ):
+            cost = (
+                timeit(lambda: type_adapter.validate_python(packet(encoded_packet=encoded).data[1]), number=number)
+                / number
+                * 1e6
+            )
+            if packet is BaseMsgPackPacket:
+                base = cost
+            print(f"  {label:<28} {cost:>10.1f}us  x{base / cost:.2f}")
@@ -0,0 +1,78 @@
+"""回应事件转换为 Group/Private 子类的开销对比
+
+python -m benchmark.bench_reaction
+
+仓库内没有真实的抓包数据，这里构造一串回应事件，消息均可从本地消息缓存获取(不计网络开销)
+"""
+
+import asyncio
+from time import perf_counter
+from types import SimpleNamespace
+
+from nonebot_adapter_tailchat.cache import MessageCache
+from nonebot_adapter_tailchat.event import (
+    DefaultReactionAddEvent,
+    DefaultReactionEvent,
+    GroupReactionAddEvent,
+    PrivateReactionAddEvent,
+)
+
+from .bench_json import message, object_id
+
+EVENTS = 2000
+
+
+async def build_validate(bot, obj: dict):
+    """改动前: 子类重新校验所有字段"""
+    event = await DefaultReactionEvent.build.__func__(DefaultReactionAddEvent, bot, obj)
+    if event.message is None:
+        return event
+    if event.is_group():
+        return GroupReactionAddEvent.model_validate(dict(event))
+    return PrivateReactionAddEvent.model_validate(dict(event))
+
+
+async def main():
+    cache = MessageCache()
+    messages = [dict(message(i), createdAt=1724414400000, updatedAt=1724414400000) for i in range(50)]
+    for i in messages:
+        cache.put(i)
+    bot = SimpleNamespace(config=SimpleNamespace(nickname=set()), message_cache=cache)
+    events = [
+        {
+            "event_name": "notify:chat.message.addReaction",
+            "self_id": object_id(1),
+            "converseId": object_id(100),
+            "messageId": messages[i % len(messages)]["_id"],
+            "reaction": {"name": ":+1:", "author": object_id(i % 13)},
+        }
+        for i in range(EVENTS)
+    ]
+    print("build (含消息解析)")
+    for label, build in (("model_validate(dict(event))", build_validate), ("_promote", DefaultReactionAddEvent.build)):
+        start = perf_counter()
+        for obj in events:
+            await build(bot, dict(obj))
+        cost = (perf_counter() - start) / EVENTS * 1e6
+        if build is build_validate:
+            base = cost
+        print(f"  {label:<28} {cost:>8.1f}us/event  x{base / cost:.2f}")
+
+    print("仅转换为子类")
+    built = [await DefaultReactionEvent.build.__func__(DefaultReactionAddEvent, bot, dict(obj)) for obj in events]
+    for label, promote in (
+        ("model_validate(dict(event))", lambda event: GroupReactionAddEvent.model_validate(dict(event))),
+        ("_promote", lambda event: event._promote(GroupReactionAddEvent)),
+    ):
+        start = perf_counter()
+        for event in built:
+            promote(event)
+        cost = (perf_counter() - start) / EVENTS * 1e6
+        if label.startswith("model_validate"):
+            base = cost
+        print(f"  {label:<28} {cost:>8.1f}us/event  x{base / cost:.2f}")
+
+
+if __name__ == "__main__":
+    print(f"{EVENTS} reaction events")
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+"""回放 EventRecorder 记录的事件，测量 get_event -> build -> handle_event 的吞吐
+
+python -m benchmark.bench_replay events.msgpack [--speed 10] [--self-id xxx]
+
+记录文件通过配置 TAILCHAT_RECORD_FILE 在线上环境采集，不需要连接服务器即可回放，
+需要调用接口的事件(如消息缓存未命中的回应事件)会失败并记录日志
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+import nonebot
+
+from nonebot_adapter_tailchat import Adapter, Bot
+from nonebot_adapter_tailchat.config import BotInfo
+from nonebot_adapter_tailchat.record import read_events, replay
+
+
+async def main(args: argparse.Namespace):
+    nonebot.init()
+    driver = nonebot.get_driver()
+    driver.register_adapter(Adapter)
+    adapter = next(i for i in driver._adapters.values() if isinstance(i, Adapter))
+    self_id = args.self_id or next(read_events(args.file))[1]  # 默认使用第一条记录的 bot
+    bot = Bot(adapter, self_id, BotInfo(url="http://127.0.0.1"))
+
+    start = perf_counter()
+    count = await replay(bot, args.file, args.speed, args.self_id)
+    elapsed = perf_counter() - start
+    print(f"{count} events in {elapsed:.3f}s, {count / elapsed if elapsed else 0:.0f} events/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file")
+    parser.add_argument("--speed", type=float, default=None, help="相对原始速度的倍数，默认尽快回放")
+    parser.add_argument("--self-id", default=None, help="只回放该 bot 收到的事件")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,49 @@
+"""每次调用构建 TypeAdapter 与模块级缓存 TypeAdapter 的开销对比
+
+python -m benchmark.bench_type_adapter
+"""
+
+from timeit import timeit
+
+from pydantic import TypeAdapter
+
+from nonebot_adapter_tailchat.model import MessageRet
+
+MESSAGE = {
+    "_id": "66c8a1f0e2b1a2c3d4e5f601",
+    "content": "[b]hello[/b] [at=66c8a1f0e2b1a2c3d4e5f602]eya46[/at]",
+    "author": "66c8a1f0e2b1a2c3d4e5f602",
+    "converseId": "66c8a1f0e2b1a2c3d4e5f603",
+    "groupId": "66c8a1f0e2b1a2c3d4e5f604",
+    "hasRecall": False,
+    "reactions": [{"name": ":smirk:", "author": "66c8a1f0e2b1a2c3d4e5f602"}],
+    "createdAt": "2024-08-23T12:00:00.000Z",
+    "updatedAt": "2024-08-23T12:00:00.000Z",
+    "meta": {"mentions": ["66c8a1f0e2b1a2c3d4e5f602"]},
+    "__v": 0,
+}
+PAGE = [MESSAGE] * 50
+
+_MessageRetAdapter = TypeAdapter(MessageRet)
+_ListMessageRetAdapter = TypeAdapter(list[MessageRet])
+
+
+def bench(name: str, fresh, cached, number: int):
+    before = timeit(fresh, number=number) / number * 1e6
+    after = timeit(cached, number=number) / number * 1e6
+    print(f"{name:<24} fresh: {before:>9.2f}us  cached: {after:>9.2f}us  x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    bench(
+        "MessageRet",
+        lambda: TypeAdapter(MessageRet).validate_python(MESSAGE),
+        lambda: _MessageRetAdapter.validate_python(MESSAGE),
+        5000,
+    )
+    bench(
+        "list[MessageRet] (50)",
+        lambda: TypeAdapter(list[MessageRet]).validate_python(PAGE),
+        lambda: _ListMessageRetAdapter.validate_python(PAGE),
+        1000,
+    )
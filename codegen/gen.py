@@ -1,12 +1,21 @@
+import re
+
 from yaml import safe_load
 
 with open("api.yml", encoding="utf-8") as f:
     data = safe_load(f)
 
 
+def adapter_name(ret: str) -> str:
+    """list[MessageRet] -> _ListMessageRetAdapter"""
+    return "_" + "".join(i[0].upper() + i[1:] for i in re.findall(r"\w+", ret)) + "Adapter"
+
+
 def gencode(flag):
     apis = data.items()
     apis = sorted(apis, key=lambda x: len(x[0]))
+    adapters = {}  # 模块级 TypeAdapter，避免每次调用都重新构建 schema
+    methods = []
     for name, arr in apis:
         if name.startswith("plugin:"):
             continue
@@ -65,28 +74,34 @@ def gencode(flag):
 
         fret = ""
         if isinstance(ret, str):
-            code = f"TypeAdapter({ret}).validate_python({code})"
-            code_a = f"TypeAdapter({ret}).validate_python({code_a})"
+            adapters.setdefault(ret, adapter_name(ret))
+            code = f"{adapters[ret]}.validate_python({code})"
+            code_a = f"{adapters[ret]}.validate_python({code_a})"
             fret = f" -> {ret}"
         elif isinstance(ret, list) and len(ret) == 1:
             fret = f" -> {ret[0]}"
 
         kwargs = ", *, " + ", ".join(kwargs) if kwargs else ""
         if flag:
-            print(
+            methods.append(
                 f"""
     def {name}(self{kwargs}){fret}:
         {desc}return {code}
 """
             )
         else:
-            print(
+            methods.append(
                 f"""
     async def {name}(self{kwargs}){fret}:
         {desc}return {code_a}
 """
             )
 
+    for ret, name in sorted(adapters.items(), key=lambda x: x[1]):
+        print(f"{name} = TypeAdapter({ret})")
+    for method in methods:
+        print(method)
+
 
 if __name__ == "__main__":
     # gencode(True)
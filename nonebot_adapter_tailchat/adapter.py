@@ -1,8 +1,9 @@
 import asyncio
 import json
 from asyncio import TimeoutError as AsyncTimeoutError
-from asyncio import create_task, gather, sleep, wait_for
+from asyncio import create_task, sleep, wait_for
 from functools import partial
+from time import perf_counter
 from traceback import print_exc
 from typing import Any, Optional
 
@@ -14,12 +15,22 @@ from nonebot.message import handle_event
 from yarl import URL
 
 from .bot import Bot
+from .catchup import catch_up
+from .codec import get_codec
 from .config import BotInfo, Config
-from .const import ADAPTER_NAME, Undefined
-from .event import get_event
-from .exception import ConnectionException, DisconnectException, get_error
+from .const import ADAPTER_NAME, READONLY_APIS, Undefined
+from .event import DefaultMessageEvent, get_event
+from .exception import ActionFailed, ConnectionException, DisconnectException, get_error
+from .interest import ADAPTER_EVENTS, EventFilter
 from .message import Message
-from .util import log, retry
+from .pipeline import EventPipeline
+from .record import EventRecorder
+from .renewal import TokenManager
+from .supervisor import ConnectionState
+from .upload import UploadCache
+from .util import SingleFlight, log, retry
+
+_MISSING = object()
 
 
 class Adapter(BaseAdapter):
@@ -27,6 +38,45 @@ class Adapter(BaseAdapter):
         super().__init__(driver, **kwargs)
         self.adapter_config: Config = get_plugin_config(Config)
         self.tasks: set[asyncio.Task] = set()
+        self.bot_instances: set[Bot] = set()
+        self.single_flight = SingleFlight()
+        self.token_manager = TokenManager(self.adapter_config.token_renew_margin)
+        self.codec = get_codec(self.adapter_config.json_codec)
+        self.upload_cache = (
+            UploadCache(self.adapter_config.upload_cache_file) if self.adapter_config.upload_cache else None
+        )
+        self.pipeline = (
+            EventPipeline(
+                self._handle_event,
+                self.adapter_config.event_workers,
+                self.adapter_config.event_queue_size,
+                self.adapter_config.event_overflow,
+                self.adapter_config.event_low_priority,
+                self.adapter_config.event_ordered,
+            )
+            if self.adapter_config.event_workers > 0
+            else None
+        )
+        self.event_filter = (
+            EventFilter(
+                self.adapter_config.event_allow,
+                self.adapter_config.event_deny,
+                # 补发消息需要记录每个会话收到的最后一条消息
+                ADAPTER_EVENTS | {"notify:chat.message.add"} if self.adapter_config.catch_up else ADAPTER_EVENTS,
+                self.adapter_config.event_filter,
+            )
+            if self.adapter_config.event_filter or self.adapter_config.event_deny
+            else None
+        )
+        self.recorder = (
+            EventRecorder(
+                self.adapter_config.record_file,
+                self.adapter_config.record_max_bytes,
+                self.adapter_config.record_backups,
+            )
+            if self.adapter_config.record_file
+            else None
+        )
         self.on_ready(self._setup)
         self.on_ready(Message.update_parser)
         self.driver.on_shutdown(self._shutdown)
@@ -37,39 +87,119 @@ class Adapter(BaseAdapter):
         return ADAPTER_NAME
 
     async def _call_api(self, bot: Bot, api: str, **data: Any) -> Any:
+        result = await self._cached_api(bot, api, **data)
+        bot.message_cache.on_api(api, result)
+        return result
+
+    async def _cached_api(self, bot: Bot, api: str, **data: Any) -> Any:
+        ttl = bot.api_cache.ttl.get(api)
+        if ttl is None or api not in READONLY_APIS:
+            return await self._flight_api(bot, api, **data)
+        key = bot.api_cache.make_key(api, {key: value for key, value in data.items() if value != Undefined})
+        result = bot.api_cache.get(key, _MISSING)
+        if result is not _MISSING:
+            return result
+        version = bot.api_cache.version
+        result = await self._flight_api(bot, api, **data)
+        if version == bot.api_cache.version:
+            bot.api_cache.set(key, result, ttl)
+        return result
+
+    async def _flight_api(self, bot: Bot, api: str, **data: Any) -> Any:
+        if self.adapter_config.single_flight and api in READONLY_APIS:
+            return await self.single_flight.do(
+                (bot.self_id, api, self._flight_key(data)), partial(self._guarded_api, bot, api, **data)
+            )
+        return await self._guarded_api(bot, api, **data)
+
+    async def _guarded_api(self, bot: Bot, api: str, **data: Any) -> Any:
+        if bot.retry_policy.times <= 0 and bot.circuit_breaker is None:
+            return await self._request_api(bot, api, **data)
+        return await bot.retry_policy.call(api, partial(self._request_api, bot, api, **data), bot.circuit_breaker)
+
+    @staticmethod
+    def _flight_key(data: dict[str, Any]) -> str:
+        return json.dumps(
+            {key: value for key, value in data.items() if value != Undefined}, sort_keys=True, default=repr
+        )
+
+    async def _request_api(self, bot: Bot, api: str, **data: Any) -> Any:
         use_http = data.get("use_http_", bot.base_info.useHttp)  # 使用http
         use_sio = data.get("use_sio_", not use_http)  # 使用socketio
         use_api = data.get("use_api_", True)  # url / 'api' / api
         raw_data_ = data.pop("raw_data_", False)  # 返回原始数据
         if not bot.base_info.useHttp and (not use_sio or use_http):
             log("WARNING", f"use_http is False, but api <y>{api}</y> use / strictly.")
-        if use_http or not use_sio:
-            if not self.is_http_client_driver:
-                raise RuntimeError("HTTPClientMixin is required when use http")
-            self.driver: HTTPClientMixin
-            resp = await self.driver.request(
-                Request(
-                    "POST",
-                    str((URL(bot.url) / "api" if use_api else URL(bot.url)) / api),
-                    headers={"X-Token": bot.base_info.jwt or ""},
-                    **(
-                        data.get(
-                            "kvs_",
-                            {
-                                "json": {key: value for key, value in data.items() if value != Undefined},
-                            },
-                        )
-                    ),
-                )
-            )
-            data = self._loads(resp.content)
-            self._handle_http_api(resp, data)
+        if (
+            self.adapter_config.adaptive_transport
+            and self.is_http_client_driver
+            # 指定了通道的接口(upload/loginBot)不参与选择
+            and not {"use_http_", "use_sio_", "use_api_", "kvs_"} & data.keys()
+        ):
+            data = await self._adaptive_request(bot, api, data)
+        elif use_http or not use_sio:
+            data = await self._request_http(bot, api, data, use_api)
         else:
-            data = await bot.sio.call(api, {key: value for key, value in data.items() if value != Undefined})
-            self._handle_socketio_api(data)
+            data = await self._request_sio(bot, api, data)
         return data if raw_data_ else data.get("data")
 
+    async def _adaptive_request(self, bot: Bot, api: str, data: dict[str, Any]) -> Any:
+        readonly = api in READONLY_APIS
+        transports = bot.transport.rank(api, sio=bot.sio.connected, explore=readonly)
+        for index, transport in enumerate(transports):
+            start = perf_counter()
+            try:
+                if transport == "http":
+                    result = await self._request_http(bot, api, data, True)
+                else:
+                    result = await self._request_sio(bot, api, data)
+            except ActionFailed:
+                # 服务端正常返回了错误，通道本身是健康的
+                bot.transport.record(api, transport, perf_counter() - start, True)
+                raise
+            except Exception as e:
+                bot.transport.record(api, transport, perf_counter() - start, False)
+                # 非只读接口可能已经执行，不能换通道重试
+                if not readonly or index + 1 >= len(transports):
+                    raise
+                log.debug(f"Transport {transport} failed for api <y>{api}</y>: {repr(e)}, fallback")
+                continue
+            bot.transport.record(api, transport, perf_counter() - start, True)
+            return result
+        raise RuntimeError(f"No transport available for api {api}")
+
+    async def _request_http(self, bot: Bot, api: str, data: dict[str, Any], use_api: bool) -> Any:
+        if not self.is_http_client_driver:
+            raise RuntimeError("HTTPClientMixin is required when use http")
+        self.driver: HTTPClientMixin
+        headers = {"X-Token": bot.base_info.jwt or ""}
+        kvs = data.get("kvs_")
+        if kvs is None:
+            kvs = {"content": self.codec.dumps({key: value for key, value in data.items() if value != Undefined})}
+            headers["Content-Type"] = "application/json"
+        request = Request(
+            "POST",
+            str((URL(bot.url) / "api" if use_api else URL(bot.url)) / api),
+            headers=headers,
+            **kvs,
+        )
+        if bot.session is None:
+            resp = await self.driver.request(request)
+        else:
+            async with bot.session_limit:
+                resp = await bot.session.request(request)
+        data = self._loads(resp.content)
+        self._handle_http_api(resp, data)
+        return data
+
+    async def _request_sio(self, bot: Bot, api: str, data: dict[str, Any]) -> Any:
+        data = await bot.sio.call(api, {key: value for key, value in data.items() if value != Undefined})
+        self._handle_socketio_api(data)
+        return data
+
     async def _setup(self):
+        if self.pipeline is not None:
+            self.pipeline.start()
         if any(i.useHttp for i in self.adapter_config.bots_info) and not self.is_http_client_driver:
             raise RuntimeError("HTTPClientMixin is required when use http")
         for i in self.adapter_config.bots_info:
@@ -82,6 +212,7 @@ class Adapter(BaseAdapter):
             self.tasks.add(task)
 
     async def _shutdown(self):
+        self.token_manager.close()
         for task in self.tasks:
             if not task.done():
                 task.cancel()
@@ -90,44 +221,79 @@ class Adapter(BaseAdapter):
             *(asyncio.wait_for(task, timeout=10) for task in self.tasks),
             return_exceptions=True,
         )
+        # 断开连接后不再收到事件
+        await asyncio.gather(
+            *(bot.sio.disconnect() for bot in self.bot_instances),
+            return_exceptions=True,
+        )
+        if self.pipeline is not None:
+            await self.pipeline.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        for bot in self.bot_instances:
+            if bot.send_queue is not None:
+                await bot.send_queue.close()
+        await asyncio.gather(
+            *(bot.close_session() for bot in self.bot_instances),
+            return_exceptions=True,
+        )
 
     async def _handle_bot(self, bot_info: BotInfo):
-        connected = False
-
-        async def _wait():  # 确保断连后打断wait
-            nonlocal connected
-            while True:
-                if not connected:
-                    raise DisconnectException()
-                await sleep(1)
-
-        def _check():
-            nonlocal connected
-            connected = False
-
         bot = Bot(self, bot_info.appId, bot_info)
-        bot.sio.on("*", partial(self._handle_event, bot))
-        bot.sio.on("disconnect", _check)
+        supervisor = bot.supervisor
+        bot.sio.on("*", partial(self._receive_event, bot))
+        bot.sio.on("disconnect", supervisor.on_disconnect)
+        self.bot_instances.add(bot)
+        if self.is_http_client_driver:
+            self.driver: HTTPClientMixin
+            await bot.open_session(
+                self.driver.get_session(
+                    headers={"Connection": "keep-alive" if self.adapter_config.http_keep_alive else "close"}
+                ),
+                self.adapter_config.http_pool_size,
+            )
         while True:
             try:
+                supervisor.transition(ConnectionState.AUTHENTICATING)
                 await wait_for(bot.login(bot.base_info.jwt), self.adapter_config.time_out)
                 await wait_for(self._connect_bot(bot), self.adapter_config.time_out)
+                supervisor.transition(ConnectionState.READY)
                 self._bot_connect(bot)
-                connected = True
-                await gather(bot.sio.wait(), _wait(), bot.keep_alive())
+                self.token_manager.schedule(bot)
+                catching_up = None
+                if self.adapter_config.catch_up and supervisor.metrics[ConnectionState.READY].count > 1:
+                    catching_up = create_task(self._catch_up(bot))  # 仅重连时补发
+                try:
+                    await supervisor.wait_disconnect()  # 断连后立即返回
+                finally:
+                    if catching_up is not None:
+                        catching_up.cancel()
             except DisconnectException:
                 log.warning(f"Bot {escape_tag(str(bot))} socketio connection closed")
             except AsyncTimeoutError:
-                log.warning(f"Bot {escape_tag(str(bot))} connection timeout")
+                log.warning(f"Bot {escape_tag(str(bot))} connection timeout when {supervisor.state.value}")
             except ConnectionException as e:
                 log.error(f"Error when chat.converse.findAndJoinRoom: {repr(e)}")
             except Exception as e:
                 log.error(f"Error when _handle_bot: {repr(e)}")
                 print_exc()
-            connected = False
+            self.token_manager.cancel(bot)  # 重连登录后重新调度
             self._bot_disconnect(bot)
-            log.debug(f"Bot {escape_tag(str(bot))} will reconnect in {self.adapter_config.reconnect_interval} seconds")
-            await sleep(self.adapter_config.reconnect_interval)
+            delay = supervisor.next_backoff()
+            supervisor.transition(ConnectionState.BACKING_OFF)
+            log.debug(f"Bot {escape_tag(str(bot))} will reconnect in {delay:.2f} seconds")
+            await sleep(delay)
+
+    async def _catch_up(self, bot: Bot):
+        try:
+            await catch_up(
+                bot,
+                partial(self._dispatch_event, bot, "notify:chat.message.add"),
+                self.adapter_config.catch_up_concurrency,
+                self.adapter_config.catch_up_limit,
+            )
+        except Exception as e:
+            log.error(f"Error when catch up missed messages: {repr(e)}")
 
     def _bot_connect(self, bot: Bot):
         try:
@@ -144,29 +310,52 @@ class Adapter(BaseAdapter):
     @staticmethod
     async def _connect_bot(bot: Bot):
         log.debug(f"try to connect bot {escape_tag(str(bot))}")
+        bot.supervisor.transition(ConnectionState.CONNECTING)
         try:
             await bot.connect()
         except Exception as e:
             log.trace(f"Error when bot.connect: {repr(e)}")
+        bot.supervisor.transition(ConnectionState.JOINING)
         try:
             await bot.sio.emit("chat.converse.findAndJoinRoom")
             log.success(f"<y>Bot {escape_tag(str(bot))}</y> connected")
         except Exception:
             raise ConnectionException(f"Bot {str(bot)} join room fail")
 
+    async def _receive_event(self, bot: Bot, event: str, data: dict, _: Optional[any] = None):
+        if self.recorder is not None:
+            self.recorder.write(bot.self_id, event, data)
+        await self._dispatch_event(bot, event, data)
+
+    async def _dispatch_event(self, bot: Bot, event: str, data: dict):
+        """收到的事件和重连后补发的消息经过相同的缓存、过滤和事件队列"""
+        bot.message_cache.on_event(event, data)  # 被过滤的消息事件也需要缓存
+        if self.event_filter is not None and not self.event_filter.interested(event):
+            log.trace(f"Event skipped: {event}")
+            return
+        if self.pipeline is None:
+            return await self._handle_event(bot, event, data)
+        await self.pipeline.put(bot, event, data)
+
     @staticmethod
     async def _handle_event(bot: Bot, event: str, data: dict, _: Optional[any] = None):
+        if bot.event_dedup.is_duplicate(event, data):
+            log.trace(f"Duplicate event dropped: {event}")
+            return
         model = get_event(event)
         log.trace(f"Event: {event}, MatchModel: {model}, Data: {data}")
         data["event_name"] = data.get("event_name", event)
         data["self_id"] = data.get("self_id", bot.self_id)
-        await handle_event(bot, await model.build(bot, data))
+        event = await model.build(bot, data)
+        if isinstance(event, DefaultMessageEvent) and event.id > bot.last_message_ids.get(event.converseId, ""):
+            bot.last_message_ids[event.converseId] = event.id
+        bot.api_cache.invalidate_event(event)
+        await handle_event(bot, event)
 
-    @staticmethod
-    def _loads(data: ContentTypes) -> Any:
+    def _loads(self, data: ContentTypes) -> Any:
         try:
-            return json.loads(data)
-        except json.JSONDecodeError:
+            return self.codec.loads(data)
+        except self.codec.errors:
             log.error("Error when loads data", escape_tag(data.decode() if isinstance(data, bytes) else str(data)))
             raise
 
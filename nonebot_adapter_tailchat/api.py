@@ -28,11 +28,36 @@ from .model import (
     Whoami,
 )
 
+_AddFriendRequestRetAdapter = TypeAdapter(AddFriendRequestRet)
+_BaseGroupInfoAdapter = TypeAdapter(BaseGroupInfo)
+_BotInfoRetAdapter = TypeAdapter(BotInfoRet)
+_ClientConfigAdapter = TypeAdapter(ClientConfig)
+_ConverseInfoAdapter = TypeAdapter(ConverseInfo)
+_FindAndJoinRoomRetAdapter = TypeAdapter(FindAndJoinRoomRet)
+_GroupAndPanelIdsAdapter = TypeAdapter(GroupAndPanelIds)
+_GroupInfoAdapter = TypeAdapter(GroupInfo)
+_HealthAdapter = TypeAdapter(Health)
+_InviteCodeInfoAdapter = TypeAdapter(InviteCodeInfo)
+_ListAckAdapter = TypeAdapter(list[Ack])
+_ListAddFriendRequestRetAdapter = TypeAdapter(list[AddFriendRequestRet])
+_ListGroupInfoAdapter = TypeAdapter(list[GroupInfo])
+_ListInviteCodeInfoAdapter = TypeAdapter(list[InviteCodeInfo])
+_ListLastMessagesAdapter = TypeAdapter(list[LastMessages])
+_ListMessageRetAdapter = TypeAdapter(list[MessageRet])
+_ListUserInfoAdapter = TypeAdapter(list[UserInfo])
+_MessageRetAdapter = TypeAdapter(MessageRet)
+_OptionalInviteCodeInfoAdapter = TypeAdapter(Optional[InviteCodeInfo])
+_OptionalUserInfoAdapter = TypeAdapter(Optional[UserInfo])
+_TemporaryUserInfoAdapter = TypeAdapter(TemporaryUserInfo)
+_TokenInfoAdapter = TypeAdapter(TokenInfo)
+_UserInfoAdapter = TypeAdapter(UserInfo)
+_WhoamiAdapter = TypeAdapter(Whoami)
+
 
 class API(BaseBot, ABC):
     async def allAck(self) -> list[Ack]:
         """获取所有会话的最后一条消息的ID"""
-        return TypeAdapter(list[Ack]).validate_python(await self.call_api("chat.ack.all"))
+        return _ListAckAdapter.validate_python(await self.call_api("chat.ack.all"))
 
     async def allApp(self):
         """获取当前账号全部openapi app信息"""
@@ -44,7 +69,7 @@ class API(BaseBot, ABC):
 
     async def whoami(self) -> Whoami:
         """获取当前账户信息"""
-        return TypeAdapter(Whoami).validate_python(await self.call_api("user.whoami"))
+        return _WhoamiAdapter.validate_python(await self.call_api("user.whoami"))
 
     async def getFile(self, *, objectName: str):
         """获取客户端的信息"""
@@ -56,7 +81,7 @@ class API(BaseBot, ABC):
 
     async def allInbox(self) -> MessageRet:
         """获取用户收件箱中所有内容"""
-        return TypeAdapter(MessageRet).validate_python(await self.call_api("chat.inbox.all"))
+        return _MessageRetAdapter.validate_python(await self.call_api("chat.inbox.all"))
 
     async def isMember(self, *, groupId: str):
         """是否为指定群的成员"""
@@ -107,7 +132,7 @@ class API(BaseBot, ABC):
         self, *, password: str, email: Optional[str] = Undefined, username: Optional[str] = Undefined
     ) -> TokenInfo:
         """标准登录API"""
-        return TypeAdapter(TokenInfo).validate_python(
+        return _TokenInfoAdapter.validate_python(
             await self.call_api("user.login", email=email, password=password, username=username)
         )
 
@@ -125,13 +150,13 @@ class API(BaseBot, ABC):
 
     async def addRequest(self, *, to: str, message: Optional[str] = Undefined) -> AddFriendRequestRet:
         """发送好友申请(message好像没用, 请求处理界面看不到message).不存在的id也能发送成功.不符合格式的id会报错."""
-        return TypeAdapter(AddFriendRequestRet).validate_python(
+        return _AddFriendRequestRetAdapter.validate_python(
             await self.call_api("friend.request.add", to=to, message=message)
         )
 
     async def allRelated(self) -> list[AddFriendRequestRet]:
         """所有与自己相关的好友请求, 包括自己发出的和别人发给自己的"""
-        return TypeAdapter(list[AddFriendRequestRet]).validate_python(await self.call_api("friend.request.allRelated"))
+        return _ListAddFriendRequestRetAdapter.validate_python(await self.call_api("friend.request.allRelated"))
 
     async def clearInbox(self) -> bool:
         """清空所有的收件箱内容"""
@@ -143,9 +168,7 @@ class API(BaseBot, ABC):
 
     async def getMessage(self, *, messageId: str) -> MessageRet:
         """获取消息"""
-        return TypeAdapter(MessageRet).validate_python(
-            await self.call_api("chat.message.getMessage", messageId=messageId)
-        )
+        return _MessageRetAdapter.validate_python(await self.call_api("chat.message.getMessage", messageId=messageId))
 
     async def addConverse(self, *, converseId: str):
         """加入或创建会话"""
@@ -161,9 +184,7 @@ class API(BaseBot, ABC):
 
     async def createGroup(self, *, name: str, panels: list[Union[Panel, dict]]) -> GroupInfo:
         """创建群组"""
-        return TypeAdapter(GroupInfo).validate_python(
-            await self.call_api("group.createGroup", name=name, panels=panels)
-        )
+        return _GroupInfoAdapter.validate_python(await self.call_api("group.createGroup", name=name, panels=panels))
 
     async def denyRequest(self, *, requestId: str):
         """拒绝好友请求"""
@@ -171,7 +192,7 @@ class API(BaseBot, ABC):
 
     async def getUserInfo(self, *, userId: str) -> UserInfo:
         """获取用户信息"""
-        return TypeAdapter(UserInfo).validate_python(await self.call_api("user.getUserInfo", userId=userId))
+        return _UserInfoAdapter.validate_python(await self.call_api("user.getUserInfo", userId=userId))
 
     async def sendMessage(
         self,
@@ -183,7 +204,7 @@ class API(BaseBot, ABC):
         groupId: Optional[str] = Undefined,
     ) -> MessageRet:
         """发送消息"""
-        return TypeAdapter(MessageRet).validate_python(
+        return _MessageRetAdapter.validate_python(
             await self.call_api(
                 "chat.message.sendMessage",
                 meta=meta,
@@ -201,7 +222,7 @@ class API(BaseBot, ABC):
 
     async def configClient(self) -> ClientConfig:
         """获取客户端配置"""
-        return TypeAdapter(ClientConfig).validate_python(await self.call_api("config.client"))
+        return _ClientConfigAdapter.validate_python(await self.call_api("config.client"))
 
     async def deleteInvite(self, *, groupId: str, inviteId: str):
         """删除邀请码"""
@@ -228,7 +249,7 @@ class API(BaseBot, ABC):
 
     async def resolveToken(self, *, token: str) -> TokenInfo:
         """获取token信息"""
-        return TypeAdapter(TokenInfo).validate_python(await self.call_api("user.resolveToken", token=token))
+        return _TokenInfoAdapter.validate_python(await self.call_api("user.resolveToken", token=token))
 
     async def acceptRequest(self, *, requestId: str):
         """接受好友请求"""
@@ -248,7 +269,7 @@ class API(BaseBot, ABC):
 
     async def gatewayHealth(self) -> Health:
         """获取网关健康状态"""
-        return TypeAdapter(Health).validate_python(await self.call_api("gateway.health"))
+        return _HealthAdapter.validate_python(await self.call_api("gateway.health"))
 
     async def getAllFriends(self) -> list[dict[str, str]]:
         """获取全部好友的ID
@@ -257,11 +278,11 @@ class API(BaseBot, ABC):
 
     async def getUserGroups(self) -> list[GroupInfo]:
         """获取用户的群组"""
-        return TypeAdapter(list[GroupInfo]).validate_python(await self.call_api("group.getUserGroups"))
+        return _ListGroupInfoAdapter.validate_python(await self.call_api("group.getUserGroups"))
 
     async def recallMessage(self, *, messageId: str) -> MessageRet:
         """撤回消息, 大于15分钟的消息无法撤回, 会报错"""
-        return TypeAdapter(MessageRet).validate_python(
+        return _MessageRetAdapter.validate_python(
             await self.call_api("chat.message.recallMessage", messageId=messageId)
         )
 
@@ -280,7 +301,7 @@ class API(BaseBot, ABC):
         self, *, text: str, converseId: str, groupId: Optional[str] = Undefined
     ) -> list[MessageRet]:
         """搜索消息"""
-        return TypeAdapter(list[MessageRet]).validate_python(
+        return _ListMessageRetAdapter.validate_python(
             await self.call_api("chat.message.searchMessage", text=text, groupId=groupId, converseId=converseId)
         )
 
@@ -324,13 +345,13 @@ class API(BaseBot, ABC):
 
     async def createGroupRole(self, *, groupId: str, roleName: str, permissions: list[str]) -> GroupInfo:
         """创建群用户组"""
-        return TypeAdapter(GroupInfo).validate_python(
+        return _GroupInfoAdapter.validate_python(
             await self.call_api("group.createGroupRole", groupId=groupId, roleName=roleName, permissions=permissions)
         )
 
     async def deleteGroupRole(self, *, roleId: str, groupId: str) -> GroupInfo:
         """删除群用户组"""
-        return TypeAdapter(GroupInfo).validate_python(
+        return _GroupInfoAdapter.validate_python(
             await self.call_api("group.deleteGroupRole", roleId=roleId, groupId=groupId)
         )
 
@@ -347,11 +368,11 @@ class API(BaseBot, ABC):
 
     async def findAndJoinRoom(self) -> FindAndJoinRoomRet:
         """查找用户相关的所有会话并加入房间"""
-        return TypeAdapter(FindAndJoinRoomRet).validate_python(await self.call_api("chat.converse.findAndJoinRoom"))
+        return _FindAndJoinRoomRetAdapter.validate_python(await self.call_api("chat.converse.findAndJoinRoom"))
 
     async def getUserInfoList(self, *, userIds: list[str]) -> list[UserInfo]:
         """获取多个用户信息"""
-        return TypeAdapter(list[UserInfo]).validate_python(await self.call_api("user.getUserInfoList", userIds=userIds))
+        return _ListUserInfoAdapter.validate_python(await self.call_api("user.getUserInfoList", userIds=userIds))
 
     async def getUserSettings(self) -> dict:
         """获取用户设置"""
@@ -377,13 +398,13 @@ class API(BaseBot, ABC):
 
     async def updateUserField(self, *, fieldName: str, fieldValue: Any) -> UserInfo:
         """更改用户信息"""
-        return TypeAdapter(UserInfo).validate_python(
+        return _UserInfoAdapter.validate_python(
             await self.call_api("user.updateUserField", fieldName=fieldName, fieldValue=fieldValue)
         )
 
     async def createDMConverse(self, *, memberIds: list[str]) -> ConverseInfo:
         """创建会话"""
-        return TypeAdapter(ConverseInfo).validate_python(
+        return _ConverseInfoAdapter.validate_python(
             await self.call_api("chat.converse.createDMConverse", memberIds=memberIds)
         )
 
@@ -412,25 +433,25 @@ class API(BaseBot, ABC):
 
     async def deleteGroupPanel(self, *, groupId: str, panelId: str) -> GroupInfo:
         """删除群组面板"""
-        return TypeAdapter(GroupInfo).validate_python(
+        return _GroupInfoAdapter.validate_python(
             await self.call_api("group.deleteGroupPanel", groupId=groupId, panelId=panelId)
         )
 
     async def ensureOpenapiBot(self, *, botId: str, nickname: str, avatar: Optional[str] = Undefined) -> BotInfoRet:
         """确保第三方开放平台机器人存在(没有则自动创建)"""
-        return TypeAdapter(BotInfoRet).validate_python(
+        return _BotInfoRetAdapter.validate_python(
             await self.call_api("user.ensureOpenapiBot", botId=botId, avatar=avatar, nickname=nickname)
         )
 
     async def findConverseInfo(self, *, converseId: str) -> ConverseInfo:
         """获取会话信息, 只能用于DM(私信)/Multi(多人会话)"""
-        return TypeAdapter(ConverseInfo).validate_python(
+        return _ConverseInfoAdapter.validate_python(
             await self.call_api("chat.converse.findConverseInfo", converseId=converseId)
         )
 
     async def findInviteByCode(self, *, code: str) -> Optional[InviteCodeInfo]:
         """通过邀请码查找群组邀请信息"""
-        return TypeAdapter(Optional[InviteCodeInfo]).validate_python(
+        return _OptionalInviteCodeInfoAdapter.validate_python(
             await self.call_api("group.invite.findInviteByCode", code=code)
         )
 
@@ -477,7 +498,7 @@ class API(BaseBot, ABC):
 
     async def createGroupInvite(self, *, groupId: str, inviteType: Literal["normal", "permanent"]) -> InviteCodeInfo:
         """创建群组邀请码"""
-        return TypeAdapter(InviteCodeInfo).validate_python(
+        return _InviteCodeInfoAdapter.validate_python(
             await self.call_api("group.invite.createGroupInvite", groupId=groupId, inviteType=inviteType)
         )
 
@@ -487,9 +508,7 @@ class API(BaseBot, ABC):
 
     async def getGroupBasicInfo(self, *, groupId: str) -> BaseGroupInfo:
         """获取群基本消息"""
-        return TypeAdapter(BaseGroupInfo).validate_python(
-            await self.call_api("group.getGroupBasicInfo", groupId=groupId)
-        )
+        return _BaseGroupInfoAdapter.validate_python(await self.call_api("group.getGroupBasicInfo", groupId=groupId))
 
     async def setFriendNickname(self, *, nickname: str, targetId: str) -> bool:
         """设置好友昵称"""
@@ -524,7 +543,7 @@ class API(BaseBot, ABC):
         self, *, messageId: str, converseId: str, num: Optional[int] = Undefined, groupId: Optional[str] = Undefined
     ) -> list[MessageRet]:
         """获取指定消息的上下文"""
-        return TypeAdapter(list[MessageRet]).validate_python(
+        return _ListMessageRetAdapter.validate_python(
             await self.call_api(
                 "chat.message.fetchNearbyMessage", num=num, groupId=groupId, messageId=messageId, converseId=converseId
             )
@@ -540,25 +559,25 @@ class API(BaseBot, ABC):
 
     async def createTemporaryUser(self, *, nickname: str) -> TemporaryUserInfo:
         """创建临时用户"""
-        return TypeAdapter(TemporaryUserInfo).validate_python(
+        return _TemporaryUserInfoAdapter.validate_python(
             await self.call_api("user.createTemporaryUser", nickname=nickname)
         )
 
     async def updateGroupRoleName(self, *, roleId: str, groupId: str, roleName: str) -> GroupInfo:
         """更新群用户组名称"""
-        return TypeAdapter(GroupInfo).validate_python(
+        return _GroupInfoAdapter.validate_python(
             await self.call_api("group.updateGroupRoleName", roleId=roleId, groupId=groupId, roleName=roleName)
         )
 
     async def fetchConverseMessage(self, *, converseId: str, startId: Optional[str] = Undefined) -> list[MessageRet]:
         """获取会话消息"""
-        return TypeAdapter(list[MessageRet]).validate_python(
+        return _ListMessageRetAdapter.validate_python(
             await self.call_api("chat.message.fetchConverseMessage", startId=startId, converseId=converseId)
         )
 
     async def getAllGroupInviteCode(self, *, groupId: str) -> list[InviteCodeInfo]:
         """获取所有群组邀请码"""
-        return TypeAdapter(list[InviteCodeInfo]).validate_python(
+        return _ListInviteCodeInfoAdapter.validate_python(
             await self.call_api("group.invite.getAllGroupInviteCode", groupId=groupId)
         )
 
@@ -580,23 +599,23 @@ class API(BaseBot, ABC):
 
     async def searchUserWithUniqueName(self, *, uniqueName: str) -> Optional[UserInfo]:
         """根据唯一名搜索用户"""
-        return TypeAdapter(Optional[UserInfo]).validate_python(
+        return _OptionalUserInfoAdapter.validate_python(
             await self.call_api("user.searchUserWithUniqueName", uniqueName=uniqueName)
         )
 
     async def fetchConverseLastMessages(self, *, converseIds: list[str]) -> list[LastMessages]:
         """获取多个会话的最后一条消息"""
-        return TypeAdapter(list[LastMessages]).validate_python(
+        return _ListLastMessagesAdapter.validate_python(
             await self.call_api("chat.message.fetchConverseLastMessages", converseIds=converseIds)
         )
 
     async def getJoinedGroupAndPanelIds(self) -> GroupAndPanelIds:
         """获取加入的群组和面板ID"""
-        return TypeAdapter(GroupAndPanelIds).validate_python(await self.call_api("group.getJoinedGroupAndPanelIds"))
+        return _GroupAndPanelIdsAdapter.validate_python(await self.call_api("group.getJoinedGroupAndPanelIds"))
 
     async def updateGroupRolePermission(self, *, roleId: str, groupId: str, permissions: list[str]) -> GroupInfo:
         """更新群用户组权限"""
-        return TypeAdapter(GroupInfo).validate_python(
+        return _GroupInfoAdapter.validate_python(
             await self.call_api(
                 "group.updateGroupRolePermission", roleId=roleId, groupId=groupId, permissions=permissions
             )
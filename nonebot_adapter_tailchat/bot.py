@@ -1,37 +1,58 @@
-from asyncio import sleep
+from asyncio import Semaphore, Task, create_task, gather
 from base64 import urlsafe_b64decode
-from functools import wraps
+from collections.abc import AsyncGenerator, Iterable
+from datetime import datetime
+from functools import partial, wraps
 from hashlib import md5
 from json import loads
+from os import PathLike
+from pathlib import Path
 from time import time
 from typing import TYPE_CHECKING, Optional, Union
 
+from nonebot.internal.driver import HTTPClientSession
 from pydantic import TypeAdapter
 from socketio import AsyncClient as AsyncSocketClient
 
 from .api import API
+from .cache import ApiCache, EventDedup, MessageCache
+from .codec import MsgPackPacket
 from .config import BotInfo
 from .const import Undefined
 from .event import Event, MessageEvent
+from .exception import DataNotFoundError
+from .limiter import SendQueue
 from .message import Message, MessageSegment
 from .model import (
     BaseBotInfo,
+    BroadcastResult,
+    BroadcastTarget,
     FileInfo,
     JwtPayload,
+    MessageMetaDict,
     MessageRet,
     TokenInfo,
+    UserInfo,
 )
-from .util import log
+from .policy import CircuitBreaker, RetryPolicy
+from .supervisor import ConnectionSupervisor
+from .transport import TransportSelector
+from .upload import UploadFile, open_upload
+from .util import BatchLoader, log
 
 if TYPE_CHECKING:
     from .adapter import Adapter
 
+_BaseBotInfoAdapter = TypeAdapter(BaseBotInfo)
+_FileInfoAdapter = TypeAdapter(FileInfo)
+_MessageRetAdapter = TypeAdapter(MessageRet)
+
 
 def _with_update_info(func):
     @wraps(func)
     async def wrapper(self: "Bot", *args, **kwargs):
         _ = await func(self, *args, **kwargs)
-        await self.update_info(self.base_info.jwt)
+        await self.update_info(self.base_info.jwt, force=True)
         return _
 
     return wrapper
@@ -70,8 +91,10 @@ class Bot(API):
         await bot.login(base_info.jwt)
         return bot
 
-    async def update_info(self, jwt: Optional[str]):
+    async def update_info(self, jwt: Optional[str], force: bool = False):
         jwt = jwt or self.base_info.jwt
+        if not force and self.info is not None and self.info.token == jwt:
+            return  # jwt 未变化，不需要重新 resolveToken
         self.info = await self.resolveToken(token=jwt)
         self.base_info.jwt = jwt
         self.self_id = self.info.userId
@@ -80,8 +103,158 @@ class Bot(API):
         super().__init__(adapter, self_id)
         self.url = str(base_info.url)
         self.base_info = base_info
-        self.sio = AsyncSocketClient(serializer="msgpack")
+        self.sio = AsyncSocketClient(serializer=MsgPackPacket)
         self.info: Optional[TokenInfo] = None
+        self._jwt_expire: Optional[tuple[str, float]] = None
+        self.last_message_ids: dict[str, str] = {}  # converseId -> 收到的最后一条消息id
+        self.session: Optional[HTTPClientSession] = None
+        self.session_limit: Optional[Semaphore] = None
+        config = adapter.adapter_config
+        self.api_cache = ApiCache(config.cache_ttl, config.cache_size)
+        self.event_dedup = EventDedup(config.dedup_window, config.dedup_size)
+        self.message_cache = MessageCache(config.message_cache_size)
+        self.transport = TransportSelector()
+        self.supervisor = ConnectionSupervisor(self_id, config.reconnect_interval, config.reconnect_interval_max)
+        self.retry_policy = RetryPolicy(config.retry_times, config.retry_backoff, config.retry_backoff_max)
+        self.circuit_breaker: Optional[CircuitBreaker] = None
+        if config.circuit_failure_threshold > 0:
+            self.circuit_breaker = CircuitBreaker(config.circuit_failure_threshold, config.circuit_reset_timeout)
+        self.send_queue: Optional[SendQueue] = None
+        if config.send_queue:
+            self.send_queue = SendQueue(
+                config.send_concurrency,
+                config.send_rate,
+                config.send_converse_rate,
+                config.send_group_rate,
+                config.send_burst,
+            )
+        self.user_info_loader: Optional[BatchLoader[str, UserInfo]] = None
+        self.user_online_loader: Optional[BatchLoader[str, bool]] = None
+        if (window := config.batch_window) is not None:
+            size = config.batch_size
+            self.user_info_loader = BatchLoader(self._batch_user_info, window, size)
+            self.user_online_loader = BatchLoader(self._batch_user_online, window, size)
+
+    async def open_session(self, session: HTTPClientSession, pool_size: int):
+        """打开长连接http会话，调用接口时复用连接"""
+        await self.close_session()
+        await session.setup()
+        self.session = session
+        self.session_limit = Semaphore(pool_size)
+
+    async def close_session(self):
+        session, self.session, self.session_limit = self.session, None, None
+        if session is not None:
+            await session.close()
+
+    async def _batch_user_info(self, userIds: list[str]) -> list[Union[UserInfo, DataNotFoundError]]:
+        infos = {i.userId: i for i in await super().getUserInfoList(userIds=userIds)}
+        return [
+            infos.get(i) or DataNotFoundError(name="DataNotFoundError", message=f"user {i} not found") for i in userIds
+        ]
+
+    async def _batch_user_online(self, userIds: list[str]) -> list[bool]:
+        return await super().checkUserOnline(userIds=userIds)
+
+    async def getUserInfo(self, *, userId: str) -> UserInfo:
+        """获取用户信息，开启 batch_window 时合并为 getUserInfoList"""
+        if self.user_info_loader is None:
+            return await super().getUserInfo(userId=userId)
+        return await self.user_info_loader.load(userId)
+
+    async def checkUserOnline(self, *, userIds: list[str]) -> list[bool]:
+        """检查用户是否在线，开启 batch_window 时合并多次调用"""
+        if self.user_online_loader is None:
+            return await super().checkUserOnline(userIds=userIds)
+        return await self.user_online_loader.load_many(userIds)
+
+    async def _fetch_converse_page(self, converseId: str, startId: Optional[str]) -> list[dict]:
+        page = await self.call_api(
+            "chat.message.fetchConverseMessage", converseId=converseId, startId=startId or Undefined
+        )
+        # ObjectId 前 8 位为创建时间，按 id 倒序即按时间倒序
+        return sorted(page or [], key=lambda i: i["_id"], reverse=True)
+
+    async def iter_converse_pages(
+        self, converseId: str, startId: Optional[str] = None, prefetch: bool = True
+    ) -> AsyncGenerator[list[dict], None]:
+        """从新到旧按 startId 翻页获取会话历史消息的原始数据，遇到空页时结束
+
+        每页按 id 倒序，prefetch 时处理当前页的同时预取下一页
+
+        :param startId: 从该消息之前开始
+        """
+        task: Optional[Task] = create_task(self._fetch_converse_page(converseId, startId))
+        try:
+            while task is not None:
+                page = await task
+                task = None
+                if not page:
+                    return
+                if prefetch:
+                    task = create_task(self._fetch_converse_page(converseId, page[-1]["_id"]))
+                yield page
+                if task is None:
+                    task = create_task(self._fetch_converse_page(converseId, page[-1]["_id"]))
+        finally:
+            if task is not None:
+                task.cancel()
+                task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def iter_converse_messages(
+        self,
+        converseId: str,
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        startId: Optional[str] = None,
+    ) -> AsyncGenerator[MessageRet, None]:
+        """从新到旧遍历会话历史消息
+
+        按 startId 翻页，处理当前页时预取下一页，
+        消息在 yield 时才校验为 MessageRet
+
+        :param since: 只返回该时间之后的消息，遇到更早的消息即停止
+        :param until: 只返回该时间之前的消息
+        :param limit: 最多返回的消息数
+        :param startId: 从该消息之前开始
+        """
+        since_ts = since.timestamp() if since else None
+        until_ts = until.timestamp() if until else None
+        count = 0
+        pages = self.iter_converse_pages(converseId, startId)
+        try:
+            async for page in pages:
+                for item in page:
+                    created = int(item["_id"][:8], 16)
+                    if until_ts is not None and created > until_ts:
+                        continue
+                    if since_ts is not None and created < since_ts:
+                        return
+                    yield _MessageRetAdapter.validate_python(item)
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+        finally:
+            await pages.aclose()  # 取消预取中的下一页
+
+    async def sendMessage(
+        self,
+        *,
+        content: str,
+        converseId: str,
+        meta: Optional[Union[dict, MessageMetaDict]] = Undefined,
+        plain: Optional[str] = Undefined,
+        groupId: Optional[str] = Undefined,
+    ) -> MessageRet:
+        """发送消息，开启 send_queue 时进入发送队列"""
+        send = partial(
+            super().sendMessage, content=content, converseId=converseId, meta=meta, plain=plain, groupId=groupId
+        )
+        if self.send_queue is None:
+            return await send()
+        return await self.send_queue.submit(converseId, None if groupId is Undefined else groupId, send)
 
     async def send(
         self,
@@ -102,35 +275,108 @@ class Bot(API):
             plain=kwargs.get("plain", Undefined),
         )
 
+    async def _resolve_lobbies(self, groupIds: set[str], concurrency: int) -> dict[str, Union[str, Exception]]:
+        """批量获取群组大厅的会话id，先用一次 getUserGroups 解析，缺失的再逐个查询"""
+        lobbies: dict[str, Union[str, Exception]] = {}
+        try:
+            for group in await self.getUserGroups():
+                if group.id in groupIds:
+                    # 大厅为第一个文字频道(type=0)
+                    panel = next((i for i in group.panels if i.type == 0), None)
+                    if panel is not None:
+                        lobbies[group.id] = panel.id
+        except Exception as e:
+            log.debug(f"{self} | getUserGroups failed when resolve lobbies: {repr(e)}")
+
+        limit = Semaphore(concurrency)
+
+        async def _resolve(groupId: str):
+            async with limit:
+                try:
+                    converseId = await self.getGroupLobbyConverseId(groupId=groupId)
+                    # 没有文字频道的群组没有大厅
+                    lobbies[groupId] = converseId or ValueError(f"Group {groupId} has no lobby converse")
+                except Exception as e:
+                    lobbies[groupId] = e
+
+        await gather(*(_resolve(i) for i in groupIds - lobbies.keys()))
+        return lobbies
+
+    async def broadcast(
+        self,
+        message: Union[str, Message, MessageSegment],
+        targets: Iterable[Union[str, BroadcastTarget]],
+        concurrency: int = 8,
+        **kwargs,
+    ) -> list[BroadcastResult]:
+        """向多个会话发送同一条消息
+
+        :param targets: 会话id 或 BroadcastTarget，只有 groupId 时发送到群组大厅
+        :param concurrency: 同时发送的数量
+        :return: 与 targets 顺序一致的发送结果，失败的目标带有 error
+        """
+        content = message if isinstance(message, str) else message.decode()
+        targets = [BroadcastTarget(converseId=i) if isinstance(i, str) else i for i in targets]
+        lobbies = await self._resolve_lobbies(
+            {i.groupId for i in targets if i.converseId is None and i.groupId}, concurrency
+        )
+        limit = Semaphore(concurrency)
+
+        async def _send(target: BroadcastTarget) -> BroadcastResult:
+            converseId = target.converseId or lobbies.get(target.groupId)
+            if converseId is None:
+                return BroadcastResult(target, error=ValueError("BroadcastTarget requires converseId or groupId"))
+            if isinstance(converseId, Exception):
+                return BroadcastResult(target, error=converseId)
+            async with limit:
+                try:
+                    return BroadcastResult(
+                        target,
+                        message=await self.sendMessage(
+                            content=content,
+                            converseId=converseId,
+                            groupId=target.groupId or Undefined,
+                            meta=kwargs.get("meta", Undefined),
+                            plain=kwargs.get("plain", Undefined),
+                        ),
+                    )
+                except Exception as e:
+                    return BroadcastResult(target, error=e)
+
+        return list(await gather(*(_send(i) for i in targets)))
+
     async def loginBot(self, *, appId: str, appSecret: str) -> BaseBotInfo:
-        return TypeAdapter(BaseBotInfo).validate_python(
+        return _BaseBotInfoAdapter.validate_python(
             await self.call_api(
                 "openapi.bot.login", token=self.md5(appId + appSecret), appId=appId, use_http_=True, use_sio_=False
             )
         )
 
-    @_with_update_info
+    def jwt_expire(self, jwt: Optional[str] = None) -> float:
+        """jwt 的过期时间戳，同一个 jwt 只解析一次"""
+        jwt = jwt or self.base_info.jwt
+        if self._jwt_expire is None or self._jwt_expire[0] != jwt:
+            self._jwt_expire = (jwt, self.decode_jwt(jwt)[1].exp.timestamp())
+        return self._jwt_expire[1]
+
     async def login(self, jwt: Optional[str] = None):
-        if jwt:
-            jwt_data = self.decode_jwt(jwt)[1]
-            if (jwt_data.exp.timestamp() - time()) > 3600:
-                self.base_info.jwt = jwt
-                return
-        if self.base_info.appId and self.base_info.appSecret:
+        margin = self.adapter.adapter_config.token_renew_margin
+        if jwt and (self.jwt_expire(jwt) - time()) > margin:
+            self.base_info.jwt = jwt
+        elif self.base_info.appId and self.base_info.appSecret:
             data = await self.loginBot(appId=self.base_info.appId, appSecret=self.base_info.appSecret)
             self.base_info.jwt = data.jwt
-            return
-        raise ValueError("必须提供jwt或appId和appSecret")
+        else:
+            raise ValueError("必须提供jwt或appId和appSecret")
+        await self.update_info(self.base_info.jwt)
 
-    async def keep_alive(self):
-        try:
-            jwt_data = self.decode_jwt(self.base_info.jwt)[1]
-            if (jwt_data.exp.timestamp() - time()) < 3600:
-                await self.login()
-            log.debug(f"{self} | keep alive")
-            await sleep(60)
-        except Exception as e:
-            log.debug(f"{self} | keep alive failed: <r>{e}</r>")
+    async def renew_token(self):
+        """通过 loginBot 续期 jwt，并替换 socketio 重连时使用的 token，不需要断开当前连接"""
+        if not (self.base_info.appId and self.base_info.appSecret):
+            raise ValueError("续期jwt需要appId和appSecret")
+        data = await self.loginBot(appId=self.base_info.appId, appSecret=self.base_info.appSecret)
+        await self.update_info(data.jwt)
+        self.sio.connection_auth = {"token": data.jwt}
 
     @_with_update_info
     async def updateNickname(self, nickname: str):
@@ -142,17 +388,32 @@ class Bot(API):
         """更新头像，机器人重登后就失效了"""
         return await self.updateUserField(fieldName="avatar", fieldValue=avatar)
 
-    async def upload(self, *, file: bytes) -> FileInfo:
-        """上传文件"""
-        return TypeAdapter(FileInfo).validate_python(
-            await self.call_api(
-                "upload",
-                kvs_={
-                    "files": {"file": file},
-                },
-                use_api_=False,
-                use_http_=True,
-                use_sio_=False,
-                raw_data_=True,
+    async def upload(self, *, file: UploadFile, filename: Optional[str] = None) -> FileInfo:
+        """上传文件
+
+        :param file: bytes / 文件路径 / 文件对象 / 异步字节迭代器，后三者流式上传
+        :param filename: 文件名，传入路径时默认为路径的文件名
+        """
+        if filename is None and isinstance(file, (str, PathLike)):
+            filename = Path(file).name
+        async with open_upload(file) as (digest, content):
+            cache = self.adapter.upload_cache
+            key = f"{self.url}|{digest}"
+            if cache is not None and (info := cache.get(key)) is not None:
+                log.debug(f"{self} | upload cache hit: {info.url}")
+                return info
+            info = _FileInfoAdapter.validate_python(
+                await self.call_api(
+                    "upload",
+                    kvs_={
+                        "files": {"file": content if filename is None else (filename, content, None)},
+                    },
+                    use_api_=False,
+                    use_http_=True,
+                    use_sio_=False,
+                    raw_data_=True,
+                )
             )
-        )
+            if cache is not None:
+                cache.set(key, info)
+            return info
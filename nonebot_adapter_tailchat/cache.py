@@ -0,0 +1,200 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from time import monotonic
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from pydantic import TypeAdapter, ValidationError
+
+from .event import (
+    AddGroupEvent,
+    ClientConfigUpdateEvent,
+    DMConverseUpdateEvent,
+    Event,
+    GroupInfoUpdateEvent,
+    RemoveGroupEvent,
+)
+from .model import MessageRet
+from .util import log
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+_MessageRetAdapter = TypeAdapter(MessageRet)
+
+
+class TTLCache(Generic[K, V]):
+    """带过期时间的 LRU 缓存"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key: K, default: Any = None, *, count: bool = True) -> Optional[V]:
+        item = self.data.get(key)
+        if item is not None and item[0] < monotonic():
+            del self.data[key]
+            item = None
+        if item is None:
+            self.misses += count
+            return default
+        self.hits += count
+        self.data.move_to_end(key)
+        return item[1]
+
+    def set(self, key: K, value: V, ttl: float = float("inf")):
+        self.data[key] = (monotonic() + ttl, value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.max_size:
+            self.data.popitem(last=False)
+
+    def pop(self, key: K, default: Any = None) -> Optional[V]:
+        item = self.data.pop(key, None)
+        return default if item is None else item[1]
+
+    def remove_if(self, predicate: Callable[[K], bool]) -> int:
+        keys = [key for key in self.data if predicate(key)]
+        for key in keys:
+            del self.data[key]
+        return len(keys)
+
+    def clear(self):
+        self.data.clear()
+
+
+class ApiCache(TTLCache[tuple[str, frozenset], Any]):
+    """接口响应缓存，key 为 (api, 参数)"""
+
+    def __init__(self, ttl: dict[str, float], max_size: int = 1024):
+        super().__init__(max_size)
+        self.ttl = ttl
+        self.version = 0  # 每次失效 +1，避免请求途中失效后写入旧数据
+
+    @staticmethod
+    def make_key(api: str, data: dict[str, Any]) -> tuple[str, frozenset]:
+        return api, frozenset((key, repr(value)) for key, value in data.items())
+
+    def invalidate(self, *apis: str, **match: Any) -> int:
+        """移除指定接口中参数匹配 match 的缓存"""
+        self.version += 1
+        items = {(key, repr(value)) for key, value in match.items()}
+        return self.remove_if(lambda key: key[0] in apis and items <= key[1])
+
+    def invalidate_event(self, event: Event) -> int:
+        if isinstance(event, (GroupInfoUpdateEvent, AddGroupEvent, RemoveGroupEvent)):
+            group_id = event.groupId if isinstance(event, RemoveGroupEvent) else event.id
+            return self.invalidate(
+                "group.getGroupBasicInfo",
+                "group.getPermissions",
+                "group.getGroupLobbyConverseId",
+                "group.isMember",
+                "group.isGroupOwner",
+                groupId=group_id,
+            ) + self.invalidate("group.getUserGroups", "group.getJoinedGroupAndPanelIds")
+        if isinstance(event, DMConverseUpdateEvent):
+            return self.invalidate("chat.converse.findConverseInfo", converseId=event.id) + self.invalidate(
+                "user.dmlist.getAllConverse"
+            )
+        if isinstance(event, ClientConfigUpdateEvent):
+            return self.invalidate("config.client")
+        return 0
+
+
+class EventDedup(TTLCache[tuple, None]):
+    """重复事件过滤，在构建事件前按事件名和消息id判断，hits 为被丢弃的重复事件数
+
+    回应事件没有唯一id，按内容判断，收到相反的回应事件时清除记录，避免重新添加同一回应被当作重复
+    """
+
+    # 回应事件 -> 相反的回应事件
+    OPPOSITE = {
+        "notify:chat.message.addReaction": "notify:chat.message.removeReaction",
+        "notify:chat.message.removeReaction": "notify:chat.message.addReaction",
+    }
+
+    def __init__(self, window: float = 0, max_size: int = 4096):
+        super().__init__(max_size)
+        self.window = window
+
+    @staticmethod
+    def make_key(event: str, data: dict[str, Any]) -> Optional[tuple]:
+        if "messageId" in data:  # 同一条消息可以有多个回应
+            reaction = data.get("reaction") or {}
+            return event, data["messageId"], reaction.get("author"), reaction.get("name")
+        if "_id" in data:  # 消息编辑后 id 不变
+            return event, data["_id"], repr(data.get("updatedAt"))
+        return None
+
+    def is_duplicate(self, event: str, data: dict[str, Any]) -> bool:
+        if self.window <= 0 or (key := self.make_key(event, data)) is None:
+            return False
+        if self.get(key, _MISSING) is not _MISSING:
+            return True
+        if (opposite := self.OPPOSITE.get(event)) is not None:
+            self.pop((opposite, *key[1:]))
+        self.set(key, None, self.window)
+        return False
+
+
+class MessageCache(TTLCache[str, dict]):
+    """最近消息的原始数据，messageId -> MessageRet 的原始数据
+
+    由消息事件和 sendMessage/getMessage/fetchConverseMessage 的结果填充，
+    回应事件据此获取消息内容，不需要再调用 getMessage
+    """
+
+    EVENT_KEYS = frozenset({"event_name", "self_id", "replayed"})  # 适配器加入事件数据的字段
+
+    def __init__(self, max_size: int = 1024):
+        super().__init__(max_size)
+
+    def put(self, data: dict[str, Any]):
+        if "_id" in data:
+            self.set(data["_id"], {key: value for key, value in data.items() if key not in self.EVENT_KEYS})
+
+    def get_message(self, messageId: str) -> Optional[MessageRet]:
+        data = self.get(messageId)
+        if data is None:
+            return None
+        try:
+            return _MessageRetAdapter.validate_python(data)
+        except ValidationError as e:  # 事件数据可能缺少 MessageRet 的字段，回退到 getMessage
+            log.debug(f"Drop cached message {messageId}: {repr(e)}")
+            self.pop(messageId)
+            return None
+
+    def on_api(self, api: str, result: Any):
+        if api in ("chat.message.sendMessage", "chat.message.getMessage") and isinstance(result, dict):
+            self.put(result)
+        elif api == "chat.message.fetchConverseMessage" and isinstance(result, list):
+            for item in result:
+                self.put(item)
+
+    def on_event(self, event: str, data: dict[str, Any]):
+        """根据原始事件数据更新缓存，在构建事件前调用"""
+        if event in ("notify:chat.message.add", "notify:chat.message.update"):
+            self.put(data)
+        elif event == "notify:chat.message.delete":
+            self.pop(data.get("messageId"))
+        elif event in ("notify:chat.message.addReaction", "notify:chat.message.removeReaction"):
+            message = self.get(data.get("messageId"), count=False)
+            reaction = data.get("reaction")
+            if message is None or not isinstance(reaction, dict):
+                return
+            reactions = [
+                i
+                for i in message.get("reactions", [])
+                if (i.get("name"), i.get("author")) != (reaction.get("name"), reaction.get("author"))
+            ]
+            if event == "notify:chat.message.addReaction":
+                reactions.append(reaction)
+            self.set(message["_id"], dict(message, reactions=reactions))
@@ -0,0 +1,76 @@
+from asyncio import Semaphore, gather
+from collections.abc import Awaitable
+from typing import TYPE_CHECKING, Callable
+
+from nonebot import escape_tag
+
+from .util import log
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+async def _backfill(bot: "Bot", converseId: str, baseline: str, limit: int) -> list[dict]:
+    """获取 baseline 之后的消息，按时间正序返回，最多 limit 条"""
+    messages: list[dict] = []
+    # 通常第一页就能找到基准消息，不预取
+    pages = bot.iter_converse_pages(converseId, prefetch=False)
+    try:
+        async for page in pages:
+            for item in page:
+                if item["_id"] <= baseline:
+                    return messages[::-1]
+                if len(messages) >= limit:
+                    log.warning(
+                        f"Bot {escape_tag(str(bot))} missed more than {limit} messages in converse {converseId}"
+                    )
+                    return messages[::-1]
+                messages.append(item)
+    finally:
+        await pages.aclose()
+    return messages[::-1]
+
+
+async def catch_up(
+    bot: "Bot",
+    dispatch: Callable[[dict], Awaitable],
+    concurrency: int = 4,
+    limit: int = 100,
+) -> int:
+    """重连后补发断线期间的消息
+
+    以已收到的最后一条消息和 allAck 中较新的一条为基准，
+    与 fetchConverseLastMessages 比较，缺失的消息标记 replayed 后重新分发
+
+    :return: 补发的消息数
+    """
+    baselines = dict(bot.last_message_ids)
+    try:
+        for ack in await bot.allAck():
+            if ack.lastMessageId > baselines.get(ack.converseId, ""):
+                baselines[ack.converseId] = ack.lastMessageId
+    except Exception as e:
+        log.debug(f"Bot {escape_tag(str(bot))} allAck failed when catch up: {repr(e)}")
+    if not baselines:
+        return 0
+
+    latest = await bot.fetchConverseLastMessages(converseIds=list(baselines))
+    missed = [i.converseId for i in latest if i.lastMessageId > baselines.get(i.converseId, i.lastMessageId)]
+    if not missed:
+        return 0
+
+    limiter = Semaphore(concurrency)
+
+    async def _catch_up(converseId: str) -> int:
+        async with limiter:
+            messages = await _backfill(bot, converseId, baselines[converseId], limit)
+        for message in messages:  # 同一会话内按顺序分发
+            try:
+                await dispatch(dict(message, replayed=True))
+            except Exception as e:
+                log.error(f"Error when replay message {message.get('_id')}: {repr(e)}")
+        return len(messages)
+
+    count = sum(await gather(*(_catch_up(i) for i in missed)))
+    log.info(f"Bot {escape_tag(str(bot))} replayed {count} missed messages in {len(missed)} converses")
+    return count
@@ -0,0 +1,84 @@
+import json
+from typing import Any, Callable, Literal, Union
+
+import msgpack
+from socketio.msgpack_packet import MsgPackPacket as BaseMsgPackPacket
+
+from .util import EXT
+
+CodecName = Literal["auto", "orjson", "msgspec", "json"]
+
+
+class JsonCodec:
+    """json 编解码，loads 直接接收 bytes，dumps 返回 bytes，errors 为 loads 抛出的解码错误类型"""
+
+    def __init__(
+        self,
+        name: str,
+        loads: Callable[[Union[bytes, str]], Any],
+        dumps: Callable[[Any], bytes],
+        errors: tuple[type[Exception], ...] = (ValueError,),
+    ):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+        self.errors = errors
+
+    def __repr__(self) -> str:
+        return f"JsonCodec(name={self.name!r})"
+
+
+def _stdlib() -> JsonCodec:
+    return JsonCodec(
+        "json",
+        json.loads,
+        lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(),
+    )
+
+
+def _orjson() -> JsonCodec:
+    import orjson
+
+    return JsonCodec("orjson", orjson.loads, orjson.dumps, (orjson.JSONDecodeError,))
+
+
+def _msgspec() -> JsonCodec:
+    import msgspec
+
+    # msgspec.DecodeError 不是 ValueError 子类
+    return JsonCodec("msgspec", msgspec.json.decode, msgspec.json.Encoder().encode, (msgspec.DecodeError,))
+
+
+CODECS: dict[str, Callable[[], JsonCodec]] = {
+    "orjson": _orjson,
+    "msgspec": _msgspec,
+    "json": _stdlib,
+}
+
+
+def get_codec(name: CodecName = "auto") -> JsonCodec:
+    """获取 json 编解码器，auto 依次尝试 orjson/msgspec，都未安装时使用标准库"""
+    if name != "auto":
+        return CODECS[name]()
+    for factory in CODECS.values():
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return _stdlib()
+
+
+def ext_hook(code: int, data: bytes) -> Any:
+    decoder = EXT.get(code)
+    return msgpack.ExtType(code, data) if decoder is None else decoder(data)
+
+
+class MsgPackPacket(BaseMsgPackPacket):
+    """socketio msgpack 序列化，解包时直接把 ext 类型(时间戳)转换为 python 值"""
+
+    def decode(self, encoded_packet: bytes):
+        decoded = msgpack.loads(encoded_packet, ext_hook=ext_hook)
+        self.packet_type = decoded["type"]
+        self.data = decoded.get("data")
+        self.id = decoded.get("id")
+        self.namespace = decoded["nsp"]
@@ -1,7 +1,11 @@
+from pathlib import Path
 from typing import Optional
 
 from pydantic import BaseModel, Field, HttpUrl
 
+from .codec import CodecName
+from .pipeline import OverflowPolicy
+
 
 class BotInfo(BaseModel):
     url: HttpUrl
@@ -15,4 +19,109 @@ class BotInfo(BaseModel):
 class Config(BaseModel):
     bots_info: list[BotInfo] = Field(alias="tailchat_bots", default_factory=list)
     reconnect_interval: int = Field(default=5, description="重连间隔", alias="tailchat_reconnect_interval")
+    reconnect_interval_max: float = Field(
+        default=60, description="重连间隔上限，连续失败时重连间隔指数增长", alias="tailchat_reconnect_interval_max"
+    )
     time_out: int = Field(default=5, description="超时时间", alias="tailchat_time_out")
+    token_renew_margin: float = Field(
+        default=3600, description="jwt过期前多少秒续期", alias="tailchat_token_renew_margin"
+    )
+    catch_up: bool = Field(default=False, description="重连后补发断线期间的消息", alias="tailchat_catch_up")
+    catch_up_concurrency: int = Field(
+        default=4, description="补发消息的并发会话数", alias="tailchat_catch_up_concurrency"
+    )
+    catch_up_limit: int = Field(default=100, description="每个会话最多补发的消息数", alias="tailchat_catch_up_limit")
+    http_pool_size: int = Field(default=10, description="每个bot的http并发连接数", alias="tailchat_http_pool_size")
+    http_keep_alive: bool = Field(default=True, description="http连接保活", alias="tailchat_http_keep_alive")
+    single_flight: bool = Field(default=False, description="合并相同的并发只读请求", alias="tailchat_single_flight")
+    batch_window: Optional[float] = Field(
+        default=None,
+        description="合并 getUserInfo/checkUserOnline 的时间窗口(秒)，0 为同一轮事件循环，None 为不合并",
+        alias="tailchat_batch_window",
+    )
+    batch_size: int = Field(default=100, description="单次合并请求的最大数量", alias="tailchat_batch_size")
+    cache_ttl: dict[str, float] = Field(
+        default_factory=dict,
+        description='只读接口的缓存时间(秒)，如 {"config.client": 3600, "group.getGroupBasicInfo": 60}',
+        alias="tailchat_cache_ttl",
+    )
+    cache_size: int = Field(default=1024, description="每个bot的接口缓存数量上限", alias="tailchat_cache_size")
+    message_cache_size: int = Field(
+        default=1024,
+        description="每个bot缓存的最近消息数量，回应事件优先从中获取消息",
+        alias="tailchat_message_cache_size",
+    )
+    dedup_window: float = Field(
+        default=0, description="重复事件过滤的时间窗口(秒)，0 为不过滤", alias="tailchat_dedup_window"
+    )
+    dedup_size: int = Field(default=4096, description="每个bot记录的事件id数量上限", alias="tailchat_dedup_size")
+    event_workers: int = Field(
+        default=0, description="处理事件的并发任务数，0 为在 socketio 回调中直接处理", alias="tailchat_event_workers"
+    )
+    event_queue_size: int = Field(default=1024, description="事件队列长度上限", alias="tailchat_event_queue_size")
+    event_overflow: OverflowPolicy = Field(
+        default="block",
+        description="事件队列满时的处理方式: block/drop_oldest/drop_low_priority",
+        alias="tailchat_event_overflow",
+    )
+    event_low_priority: set[str] = Field(
+        default={
+            "notify:chat.message.addReaction",
+            "notify:chat.message.removeReaction",
+            "notify:chat.inbox.updated",
+        },
+        description="drop_low_priority 时优先丢弃的事件",
+        alias="tailchat_event_low_priority",
+    )
+    event_ordered: bool = Field(
+        default=True, description="使用事件队列时同一会话的消息事件按顺序处理", alias="tailchat_event_ordered"
+    )
+    event_filter: bool = Field(
+        default=False, description="丢弃没有事件响应器处理的事件，不再构建事件", alias="tailchat_event_filter"
+    )
+    event_allow: set[str] = Field(
+        default_factory=set, description="event_filter 时始终处理的事件名", alias="tailchat_event_allow"
+    )
+    event_deny: set[str] = Field(default_factory=set, description="始终丢弃的事件名", alias="tailchat_event_deny")
+    record_file: Optional[Path] = Field(
+        default=None, description="把收到的原始事件记录到该文件，用于离线回放", alias="tailchat_record_file"
+    )
+    record_max_bytes: int = Field(
+        default=64 * 1024 * 1024, description="事件记录文件的轮转大小", alias="tailchat_record_max_bytes"
+    )
+    record_backups: int = Field(default=3, description="事件记录文件保留的轮转数", alias="tailchat_record_backups")
+    send_queue: bool = Field(default=False, description="通过发送队列发送消息", alias="tailchat_send_queue")
+    send_concurrency: int = Field(default=8, description="发送队列的并发数", alias="tailchat_send_concurrency")
+    send_rate: Optional[float] = Field(default=None, description="全局每秒发送数", alias="tailchat_send_rate")
+    send_converse_rate: Optional[float] = Field(
+        default=None, description="每个会话每秒发送数", alias="tailchat_send_converse_rate"
+    )
+    send_group_rate: Optional[float] = Field(
+        default=None, description="每个群组每秒发送数", alias="tailchat_send_group_rate"
+    )
+    send_burst: int = Field(default=5, description="令牌桶容量(允许的突发发送数)", alias="tailchat_send_burst")
+    json_codec: CodecName = Field(
+        default="auto",
+        description="http接口的json编解码器，auto 依次尝试 orjson/msgspec/json",
+        alias="tailchat_json_codec",
+    )
+    retry_times: int = Field(default=0, description="幂等接口临时错误的重试次数", alias="tailchat_retry_times")
+    retry_backoff: float = Field(
+        default=0.5, description="重试退避基数(秒)，按 2^n 增长并加随机抖动", alias="tailchat_retry_backoff"
+    )
+    retry_backoff_max: float = Field(default=10, description="重试退避上限(秒)", alias="tailchat_retry_backoff_max")
+    circuit_failure_threshold: int = Field(
+        default=0, description="连续临时错误达到该次数后熔断，0 为不熔断", alias="tailchat_circuit_failure_threshold"
+    )
+    circuit_reset_timeout: float = Field(
+        default=30, description="熔断后多久进入半开状态(秒)", alias="tailchat_circuit_reset_timeout"
+    )
+    upload_cache: bool = Field(default=False, description="相同内容的文件只上传一次", alias="tailchat_upload_cache")
+    upload_cache_file: Optional[Path] = Field(
+        default=None, description="上传缓存的持久化文件，None 为只缓存在内存", alias="tailchat_upload_cache_file"
+    )
+    adaptive_transport: bool = Field(
+        default=False,
+        description="按接口的延迟和错误率自动选择http/socketio，指定了通道的接口(如upload)不受影响",
+        alias="tailchat_adaptive_transport",
+    )
@@ -2,6 +2,70 @@ from typing import TypeVar, Union
 
 ADAPTER_NAME = "Tailchat"
 
+# 只读接口，重复调用无副作用
+READONLY_APIS = frozenset(
+    {
+        "chat.ack.all",
+        "chat.converse.findConverseInfo",
+        "chat.inbox.all",
+        "chat.message.fetchConverseLastMessages",
+        "chat.message.fetchConverseMessage",
+        "chat.message.fetchNearbyMessage",
+        "chat.message.getMessage",
+        "chat.message.searchMessage",
+        "config.client",
+        "file.get",
+        "file.stat",
+        "friend.checkIsFriend",
+        "friend.getAllFriends",
+        "friend.request.allRelated",
+        "gateway.checkUserOnline",
+        "gateway.health",
+        "group.extra.getGroupData",
+        "group.extra.getPanelData",
+        "group.getGroupBasicInfo",
+        "group.getGroupLobbyConverseId",
+        "group.getJoinedGroupAndPanelIds",
+        "group.getPermissions",
+        "group.getUserGroups",
+        "group.invite.findInviteByCode",
+        "group.invite.getAllGroupInviteCode",
+        "group.isGroupOwner",
+        "group.isMember",
+        "openapi.app.all",
+        "openapi.app.get",
+        "plugin.registry.list",
+        "user.checkTokenValid",
+        "user.dmlist.getAllConverse",
+        "user.findOpenapiBotId",
+        "user.getUserInfo",
+        "user.getUserInfoList",
+        "user.getUserSettings",
+        "user.resolveToken",
+        "user.searchUserWithUniqueName",
+        "user.whoami",
+    }
+)
+
+# 幂等接口，失败后可以安全重试
+IDEMPOTENT_APIS = READONLY_APIS | frozenset(
+    {
+        "chat.ack.update",
+        "chat.inbox.ack",
+        "friend.setFriendNickname",
+        "group.extra.saveGroupData",
+        "group.extra.savePanelData",
+        "openapi.app.setAppBotInfo",
+        "openapi.app.setAppCapability",
+        "openapi.app.setAppInfo",
+        "openapi.bot.login",
+        "user.login",
+        "user.setUserSettings",
+        "user.updateUserExtra",
+        "user.updateUserField",
+    }
+)
+
 
 class Undefined:
     pass
@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
+from copy import copy
+from functools import cached_property
 from typing import TYPE_CHECKING, Literal, Optional, TypeVar, Union, cast, get_args
 
+from nonebot import escape_tag
 from nonebot.adapters import Event as BaseEvent
 from nonebot.compat import model_dump
 from pydantic import Field
@@ -58,9 +61,29 @@ class Event(BaseEvent, ABC):
     async def _get_message(self, bot: "Bot" = None) -> Message:
         return self.get_message()
 
+    def _get_raw_message(self) -> Optional[str]:
+        """消息解析前的原始文本，返回 None 时总是解析消息来判断是否提及机器人"""
+        return None
+
+    def _promote(self, cls: type["E"]) -> "E":
+        """转换为子类事件，字段均已校验，直接复制状态而不重新校验(model_construct 逐字段处理反而更慢)"""
+        event = cls.__new__(cls)
+        object.__setattr__(event, "__dict__", dict(self.__dict__))
+        object.__setattr__(event, "__pydantic_fields_set__", set(self.__pydantic_fields_set__))
+        object.__setattr__(event, "__pydantic_extra__", copy(self.__pydantic_extra__))
+        object.__setattr__(event, "__pydantic_private__", copy(self.__pydantic_private__))
+        return event
+
     @classmethod
     async def build(cls, bot: "Bot", obj: dict) -> Self:
         event = cls.model_validate(obj)
+        raw = event._get_raw_message()
+        if (
+            raw is not None
+            and not raw.startswith("[")
+            and not any(raw.lstrip().startswith(i) for i in bot.config.nickname)
+        ):
+            return event  # 开头没有 BBCode 或昵称，不需要解析消息
         try:
             message: Message = await event._get_message(bot)
             # at
@@ -328,7 +351,9 @@ class DefaultReactionEvent(NoticeEvent):
             self.content = Message(self.message.content)
             return self.content
         if bot:
-            self.message = await bot.getMessage(messageId=self.messageId)
+            self.message = bot.message_cache.get_message(self.messageId) or await bot.getMessage(
+                messageId=self.messageId
+            )
             self.content = Message(self.message.content)
             return self.content
         raise ValueError("Event has no context!")
@@ -344,8 +369,8 @@ class DefaultReactionAddEvent(DefaultReactionEvent):
         if event.message is None:
             return event
         if event.is_group():
-            return GroupReactionAddEvent.model_validate(dict(event))
-        return PrivateReactionAddEvent.model_validate(dict(event))
+            return event._promote(GroupReactionAddEvent)
+        return event._promote(PrivateReactionAddEvent)
 
 
 class PrivateReactionAddEvent(DefaultReactionAddEvent):
@@ -378,8 +403,8 @@ class DefaultReactionRemoveEvent(DefaultReactionEvent):
         if event.message is None:
             return event
         if event.is_group():
-            return GroupReactionRemoveEvent.model_validate(dict(event))
-        return PrivateReactionRemoveEvent.model_validate(dict(event))
+            return event._promote(GroupReactionRemoveEvent)
+        return event._promote(PrivateReactionRemoveEvent)
 
 
 class PrivateReactionRemoveEvent(DefaultReactionRemoveEvent):
@@ -409,7 +434,6 @@ class DefaultMessageEvent(MessageEvent):
     converseId: ObjectId
     meta: Optional[MessageMeta] = Field(default=None)
 
-    content: Message
     raw_content: str = Field(alias="content")
     reactions: list[Reaction]
     createdAt: datetime
@@ -417,6 +441,8 @@ class DefaultMessageEvent(MessageEvent):
 
     groupId: Optional[ObjectId] = Field(default=None)
 
+    replayed: bool = Field(default=False)  # 重连后补发的消息
+
     def get_message_id(self) -> str:
         return self.id
 
@@ -430,9 +456,17 @@ class DefaultMessageEvent(MessageEvent):
     def reply(self) -> Optional[Reply]:
         return self.meta.reply if self.meta else None
 
+    @cached_property
+    def content(self) -> Message:
+        """首次访问时才解析消息"""
+        return Message(self.raw_content)
+
     def get_message(self) -> Message:
         return self.content
 
+    def _get_raw_message(self) -> Optional[str]:
+        return self.raw_content
+
     def get_user_id(self) -> str:
         return self.author
 
@@ -448,7 +482,7 @@ class DefaultMessageEvent(MessageEvent):
         return (
             f"Message {self.id} from {self.author}"
             + (f"@[群:{self.groupId}]" if self.groupId else "")
-            + f" {self.content.show()}"
+            + f" {escape_tag(self.raw_content)}"  # 不为日志解析消息
         )
 
     def is_group(self) -> bool:
@@ -488,6 +522,9 @@ class AtMessageEvent(MessageEvent, AtEvent):
     def get_message(self) -> Message:
         return self.payload.messageSnippet
 
+    def _get_raw_message(self) -> Optional[str]:
+        return getattr(self.payload, "raw_messageSnippet", None)
+
     def get_message_id(self) -> str:
         return self.payload.messageId
 
@@ -510,7 +547,7 @@ class AtMessageEvent(MessageEvent, AtEvent):
         return (
             f"AtMessage {self.payload.messageId} from {self.payload.messageAuthor}"
             + (f"@[群:{self.get_group_id()}]" if self.payload.groupId else "")
-            + f" {self.payload.messageSnippet.show()}"
+            + f" {escape_tag(self._get_raw_message() or '')}"
         )
 
 
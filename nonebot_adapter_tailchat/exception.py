@@ -43,6 +43,17 @@ class ConnectionException(TailchatAdapterException):
         return f"{self.__class__.__name__}(message={self.message!r})"
 
 
+class CircuitOpenError(TailchatAdapterException):
+    """熔断器打开时直接失败"""
+
+    def __init__(self, retry_after: float):
+        super().__init__()
+        self.retry_after = retry_after
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(retry_after={self.retry_after:.2f})"
+
+
 class Error(ActionFailed):
     """通用错误"""
 
@@ -0,0 +1,67 @@
+from collections.abc import Iterable
+
+from nonebot.matcher import matchers
+
+from .event import get_event
+
+# 适配器自身需要处理的事件(接口缓存失效)，没有事件响应器时也不能丢弃
+ADAPTER_EVENTS = frozenset(
+    {
+        "notify:group.add",
+        "notify:group.remove",
+        "notify:group.updateInfo",
+        "notify:chat.converse.updateDMConverse",
+        "notify:config.updateClientConfig",
+    }
+)
+
+
+class EventFilter:
+    """根据已加载的事件响应器类型和配置的事件名白名单/黑名单，在构建事件前丢弃没有响应器处理的事件"""
+
+    def __init__(
+        self,
+        allow: Iterable[str] = (),
+        deny: Iterable[str] = (),
+        always: Iterable[str] = ADAPTER_EVENTS,
+        by_matchers: bool = True,
+    ):
+        self.by_matchers = by_matchers  # False 时只按黑名单过滤
+        self.allow = frozenset(allow)
+        self.deny = frozenset(deny)
+        self.always = frozenset(always)
+        self.types: frozenset[str] = frozenset()
+        self.version: tuple = ()
+        self.cache: dict[str, bool] = {}
+        self.passed = 0
+        self.skipped = 0
+
+    @staticmethod
+    def _matcher_version() -> tuple:
+        return tuple((priority, len(items)) for priority, items in matchers.items())
+
+    def _refresh(self):
+        version = self._matcher_version()
+        if version != self.version:  # 事件响应器有增减时重新计算
+            self.version = version
+            self.types = frozenset(matcher.type for items in matchers.values() for matcher in items)
+            self.cache.clear()
+
+    def _check(self, event_name: str) -> bool:
+        if event_name in self.deny:
+            return False
+        if not self.by_matchers or event_name in self.allow or event_name in self.always or "" in self.types:
+            return True
+        return get_event(event_name).model_fields["event_type"].default in self.types
+
+    def interested(self, event_name: str) -> bool:
+        if self.by_matchers:
+            self._refresh()
+        result = self.cache.get(event_name)
+        if result is None:
+            result = self.cache[event_name] = self._check(event_name)
+        if result:
+            self.passed += 1
+        else:
+            self.skipped += 1
+        return result
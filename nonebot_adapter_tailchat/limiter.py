@@ -0,0 +1,119 @@
+from asyncio import Future, Lock, Semaphore, Task, create_task, get_running_loop, sleep
+from collections import deque
+from collections.abc import Awaitable
+from time import monotonic
+from typing import Callable, Optional, TypeVar
+
+from .cache import TTLCache
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """令牌桶，rate 为每秒生成的令牌数，capacity 为最大突发数"""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = self.capacity
+        self.updated = monotonic()
+        self.lock = Lock()  # 等待者按先后顺序获取令牌
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class SendQueue:
+    """发送队列
+
+    同一会话内按提交顺序串行发送，不同会话并行发送，
+    并发数受 concurrency 限制，速率受全局/会话/群组令牌桶限制
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        rate: Optional[float] = None,
+        converse_rate: Optional[float] = None,
+        group_rate: Optional[float] = None,
+        burst: int = 5,
+    ):
+        self.limit = Semaphore(concurrency)
+        self.burst = burst
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.converse_rate = converse_rate
+        self.group_rate = group_rate
+        # 空闲超过 burst / rate 的令牌桶已经回满，可以直接丢弃
+        self.converse_buckets: TTLCache[str, TokenBucket] = TTLCache(4096)
+        self.group_buckets: TTLCache[str, TokenBucket] = TTLCache(4096)
+        self.queues: dict[str, deque[tuple[Callable[[], Awaitable], Future, Optional[str]]]] = {}
+        self.workers: dict[str, Task] = {}
+
+    def __len__(self) -> int:
+        return sum(len(i) for i in self.queues.values())
+
+    @staticmethod
+    def _get_bucket(buckets: TTLCache[str, TokenBucket], key: str, rate: float, burst: int) -> TokenBucket:
+        bucket = buckets.get(key, count=False)
+        if bucket is None:
+            bucket = TokenBucket(rate, burst)
+        buckets.set(key, bucket, burst / rate)
+        return bucket
+
+    async def _acquire(self, converseId: str, groupId: Optional[str]):
+        if self.converse_rate:
+            await self._get_bucket(self.converse_buckets, converseId, self.converse_rate, self.burst).acquire()
+        if self.group_rate and groupId:
+            await self._get_bucket(self.group_buckets, groupId, self.group_rate, self.burst).acquire()
+        if self.bucket:
+            await self.bucket.acquire()
+
+    async def submit(self, converseId: str, groupId: Optional[str], func: Callable[[], Awaitable[T]]) -> T:
+        future = get_running_loop().create_future()
+        self.queues.setdefault(converseId, deque()).append((func, future, groupId))
+        if converseId not in self.workers:
+            self.workers[converseId] = create_task(self._work(converseId), name=f"send_queue_{converseId}")
+        return await future
+
+    async def _work(self, converseId: str):
+        queue = self.queues[converseId]
+        try:
+            while queue:
+                func, future, groupId = queue.popleft()
+                if future.done():  # 调用者已取消
+                    continue
+                try:
+                    await self._acquire(converseId, groupId)
+                    async with self.limit:
+                        result = await func()
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    if not future.done():  # 队列被关闭
+                        future.cancel()
+        finally:
+            self.workers.pop(converseId, None)
+            if not queue:
+                self.queues.pop(converseId, None)
+
+    async def close(self):
+        for worker in self.workers.values():
+            worker.cancel()
+        for queue in self.queues.values():
+            for _, future, _ in queue:
+                future.cancel()
+        self.queues.clear()
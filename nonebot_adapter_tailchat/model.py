@@ -1,17 +1,14 @@
 from collections import UserDict
 from datetime import datetime as raw_datetime
-from typing import Annotated, Literal, Optional, TypedDict
+from functools import cached_property
+from typing import Annotated, Literal, NamedTuple, Optional, TypedDict
 
-from pydantic import BaseModel, BeforeValidator, ByteSize, ConfigDict, Field, RootModel
+from pydantic import BaseModel, ByteSize, ConfigDict, Field, RootModel
 
 from .config import BotInfo
 from .message import Message, MessageSegment
-from .util import unpack
 
-datetime = Annotated[
-    raw_datetime,
-    BeforeValidator(unpack),
-]
+datetime = raw_datetime  # socketio 解包时已将 ext 类型转换为时间戳
 
 ObjectId = Annotated[str, Field(min_length=24, max_length=24)]
 ConverseType = Literal[
@@ -88,11 +85,19 @@ class Payload(RawModel):
     converseId: str
     messageId: str
     messageAuthor: str
-    messageSnippet: Message
-    messagePlainContent: Message
+    raw_messageSnippet: str = Field(alias="messageSnippet")
+    raw_messagePlainContent: str = Field(alias="messagePlainContent")
 
     groupId: Optional[str] = None
 
+    @cached_property
+    def messageSnippet(self) -> Message:
+        return Message(self.raw_messageSnippet)
+
+    @cached_property
+    def messagePlainContent(self) -> Message:
+        return Message(self.raw_messagePlainContent)
+
 
 class Announcement(RawModel):
     title: str
@@ -343,3 +348,20 @@ class BotInfoRet(RawModel):
 
 class GroupDataRet(UserDict):
     data: any
+
+
+class BroadcastTarget(NamedTuple):
+    """广播目标，只有 groupId 时发送到群组大厅"""
+
+    converseId: Optional[str] = None
+    groupId: Optional[str] = None
+
+
+class BroadcastResult(NamedTuple):
+    target: BroadcastTarget
+    message: Optional[MessageRet] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
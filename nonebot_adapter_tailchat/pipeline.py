@@ -0,0 +1,188 @@
+from asyncio import Condition, Lock, Task, create_task, gather
+from collections import deque
+from collections.abc import Awaitable, Container, Hashable
+from itertools import count
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Callable, Literal, Optional
+
+from .util import log
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+OverflowPolicy = Literal["block", "drop_oldest", "drop_low_priority"]
+
+# 同一会话内需要按顺序处理的事件
+ORDERED_EVENTS = frozenset(
+    {
+        "notify:chat.message.add",
+        "notify:chat.message.update",
+        "notify:chat.message.delete",
+        "notify:chat.message.addReaction",
+        "notify:chat.message.removeReaction",
+    }
+)
+
+
+class PipelineMetrics:
+    __slots__ = ("processed", "dropped", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.processed = 0  # 已处理的事件数
+        self.dropped = 0  # 队列满时丢弃的事件数
+        self.wait_total = 0.0  # 事件在队列中等待的累计时间
+        self.wait_max = 0.0
+
+    @property
+    def wait_avg(self) -> float:
+        return self.wait_total / self.processed if self.processed else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"PipelineMetrics(processed={self.processed}, dropped={self.dropped}, "
+            f"wait_avg={self.wait_avg:.3f}, wait_max={self.wait_max:.3f})"
+        )
+
+
+class EventPipeline:
+    """socketio 与 handle_event 之间的有界事件队列
+
+    socketio 收到的事件放入队列后立即返回，由 workers 个任务构建并分发，
+    队列满时按 overflow 阻塞、丢弃最早的事件或优先丢弃 low_priority 中的事件
+
+    ordered 时同一 bot 同一会话的消息事件按顺序处理，不同会话轮流并行处理
+    """
+
+    def __init__(
+        self,
+        handler: Callable[["Bot", str, dict], Awaitable[Any]],
+        workers: int = 4,
+        max_size: int = 1024,
+        overflow: OverflowPolicy = "block",
+        low_priority: Container[str] = frozenset(),
+        ordered: bool = True,
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.max_size = max_size
+        self.overflow = overflow
+        self.low_priority = low_priority
+        self.ordered = ordered
+        # shard -> [(入队时间, 是否低优先级, bot, 事件名, 数据)]
+        self.shards: dict[Hashable, deque[tuple[float, bool, Bot, str, dict]]] = {}
+        self.ready: deque[Hashable] = deque()  # 有待处理事件且没有在处理中的 shard
+        self.running: set[Hashable] = set()
+        self.size = 0
+        self.counter = count()
+        lock = Lock()
+        self.not_empty = Condition(lock)
+        self.not_full = Condition(lock)
+        self.tasks: list[Task] = []
+        self.metrics = PipelineMetrics()
+        self.closed = False
+
+    @property
+    def depth(self) -> int:
+        return self.size
+
+    def start(self):
+        self.closed = False
+        if not self.tasks:
+            self.tasks = [create_task(self._work(), name=f"tailchat_event_worker_{i}") for i in range(self.workers)]
+
+    def shard_key(self, bot: "Bot", event: str, data: dict) -> Hashable:
+        if self.ordered and event in ORDERED_EVENTS and (converseId := data.get("converseId")):
+            return id(bot), converseId
+        return next(self.counter)  # 无需排序的事件各自独立
+
+    def _remove(self, key: Hashable, index: int):
+        shard = self.shards[key]
+        del shard[index]
+        self.size -= 1
+        if not shard:
+            del self.shards[key]
+            if key not in self.running:
+                self.ready.remove(key)
+
+    def _evict(self, low: bool) -> bool:
+        """队列满时腾出位置，返回新事件是否可以入队"""
+        self.metrics.dropped += 1
+        victim: Optional[tuple[float, Hashable, int]] = None
+        if self.overflow == "drop_low_priority":
+            for key, shard in self.shards.items():
+                for index, item in enumerate(shard):
+                    if item[1]:
+                        if victim is None or item[0] < victim[0]:
+                            victim = item[0], key, index
+                        break
+            if victim is None and low:
+                return False
+        if victim is None:  # 各 shard 的第一个事件中最早的
+            key = min(self.shards, key=lambda i: self.shards[i][0][0])
+            victim = self.shards[key][0][0], key, 0
+        self._remove(victim[1], victim[2])
+        return True
+
+    async def put(self, bot: "Bot", event: str, data: dict):
+        low = event in self.low_priority
+        key = self.shard_key(bot, event, data)
+        async with self.not_full:
+            if self.closed:  # 关闭后没有 worker 处理
+                log.trace(f"Event pipeline closed, dropped: {event}")
+                return
+            if self.size >= self.max_size:
+                if self.overflow == "block":
+                    await self.not_full.wait_for(lambda: self.closed or self.size < self.max_size)
+                    if self.closed:
+                        return
+                elif not self._evict(low):
+                    log.trace(f"Event queue full, dropped: {event}")
+                    return
+            shard = self.shards.get(key)
+            if shard is None:
+                shard = self.shards[key] = deque()
+                if key not in self.running:
+                    self.ready.append(key)
+            shard.append((monotonic(), low, bot, event, data))
+            self.size += 1
+            self.not_empty.notify()
+
+    async def _work(self):
+        while True:
+            async with self.not_empty:
+                await self.not_empty.wait_for(lambda: self.ready)
+                key = self.ready.popleft()
+                shard = self.shards[key]
+                enqueued, _, bot, event, data = shard.popleft()
+                if not shard:
+                    del self.shards[key]
+                self.running.add(key)
+                self.size -= 1
+                self.not_full.notify()
+            wait = monotonic() - enqueued
+            self.metrics.processed += 1
+            self.metrics.wait_total += wait
+            self.metrics.wait_max = max(self.metrics.wait_max, wait)
+            try:
+                await self.handler(bot, event, data)
+            except Exception as e:
+                log.error(f"Error when handle event {event}: {repr(e)}")
+            finally:
+                async with self.not_empty:
+                    self.running.discard(key)
+                    if key in self.shards:  # 排到队尾，避免繁忙的会话占满所有 worker
+                        self.ready.append(key)
+                        self.not_empty.notify()
+
+    async def close(self):
+        self.closed = True
+        for task in self.tasks:
+            task.cancel()
+        await gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.shards.clear()
+        self.ready.clear()
+        self.running.clear()
+        self.size = 0
+        async with self.not_full:  # 唤醒阻塞的 put
+            self.not_full.notify_all()
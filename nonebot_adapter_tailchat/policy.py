@@ -0,0 +1,121 @@
+from asyncio import TimeoutError as AsyncTimeoutError
+from asyncio import sleep
+from collections.abc import Awaitable
+from random import uniform
+from time import monotonic
+from typing import Callable, Literal, Optional, TypeVar
+
+from .const import IDEMPOTENT_APIS
+from .exception import ActionFailed, CircuitOpenError
+from .util import log
+
+T = TypeVar("T")
+
+# 服务端过载/不可用时返回的错误码
+TRANSIENT_CODES = frozenset({408, 429, 500, 502, 503, 504})
+# 网络库抛出的异常均视为临时错误
+TRANSIENT_MODULES = frozenset({"socketio", "engineio", "httpx", "httpcore", "aiohttp"})
+
+
+def is_transient(error: Exception) -> bool:
+    """是否为可重试的临时错误，服务端正常返回的业务错误不重试"""
+    if isinstance(error, ActionFailed):
+        return error.code in TRANSIENT_CODES
+    return (
+        isinstance(error, (OSError, AsyncTimeoutError)) or type(error).__module__.split(".", 1)[0] in TRANSIENT_MODULES
+    )
+
+
+class CircuitBreaker:
+    """熔断器
+
+    连续 failure_threshold 次临时错误后打开，reset_timeout 秒内直接失败，
+    之后进入半开状态，只放行 half_open_max 个探测请求，成功则关闭，失败则重新打开
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30, half_open_max: int = 1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self.state: Literal["closed", "open", "half_open"] = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.rejected = 0  # 被熔断拒绝的请求数
+
+    def before_call(self) -> bool:
+        """检查是否放行请求，返回该请求是否占用了半开状态的探测名额"""
+        if self.state == "open":
+            if monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(self.opened_at + self.reset_timeout - monotonic())
+            self.state = "half_open"
+            self.probes = 0
+        if self.state == "half_open":
+            if self.probes >= self.half_open_max:
+                self.rejected += 1
+                raise CircuitOpenError(0)
+            self.probes += 1
+            return True
+        return False
+
+    def on_cancel(self, probe: bool):
+        """请求被取消(如外层超时)时没有结果，归还探测名额，否则熔断器会一直停留在半开状态"""
+        if probe and self.state == "half_open" and self.probes > 0:
+            self.probes -= 1
+
+    def on_success(self):
+        if self.state != "closed":
+            log.info(f"Circuit breaker closed after {self.failures} failures")
+        self.state = "closed"
+        self.failures = 0
+
+    def on_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                log.warning(f"Circuit breaker opened after {self.failures} failures")
+            self.state = "open"
+            self.opened_at = monotonic()
+
+
+class RetryPolicy:
+    """对幂等接口的临时错误进行指数退避重试(full jitter)"""
+
+    def __init__(self, times: int = 0, backoff: float = 0.5, backoff_max: float = 10):
+        self.times = times
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retries = 0  # 重试次数
+
+    def delay(self, attempt: int) -> float:
+        return uniform(0, min(self.backoff_max, self.backoff * 2**attempt))
+
+    async def call(self, api: str, func: Callable[[], Awaitable[T]], breaker: Optional[CircuitBreaker] = None) -> T:
+        attempt = 0
+        while True:
+            probe = breaker.before_call() if breaker is not None else False
+            try:
+                result = await func()
+            except Exception as e:
+                transient = is_transient(e)
+                if breaker is not None:
+                    if transient:
+                        breaker.on_failure()
+                    else:
+                        breaker.on_success()  # 服务端正常响应
+                if not transient or api not in IDEMPOTENT_APIS or attempt >= self.times:
+                    raise
+                delay = self.delay(attempt)
+                attempt += 1
+                self.retries += 1
+                log.debug(f"Retry api <y>{api}</y> in {delay:.2f}s ({attempt}/{self.times}): {repr(e)}")
+                await sleep(delay)
+            except BaseException:
+                if breaker is not None:
+                    breaker.on_cancel(probe)
+                raise
+            else:
+                if breaker is not None:
+                    breaker.on_success()
+                return result
@@ -0,0 +1,149 @@
+from asyncio import TimerHandle, get_running_loop, sleep
+from collections.abc import Awaitable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import monotonic, time
+from typing import TYPE_CHECKING, Callable, Optional, Union
+
+import msgpack
+
+from .codec import ext_hook
+from .util import log
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+class EventRecorder:
+    """把收到的原始事件追加写入 msgpack 日志，用于离线复现和性能测试
+
+    每条记录为 [接收时间, self_id, 事件名, 数据]，
+    记录先缓存在内存中，超过 buffer_size 字节或 flush_interval 秒后交给单独的线程写入文件，
+    文件超过 max_bytes 时依次轮转为 path.1 ... path.{backups}，更早的删除
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_bytes: int = 64 * 1024 * 1024,
+        backups: int = 3,
+        buffer_size: int = 256 * 1024,
+        flush_interval: float = 1,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.packer = msgpack.Packer()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = self.path.open("ab")
+        self.size = self.file.tell()  # 只在写入线程中修改
+        self.pending: list[bytes] = []
+        self.pending_bytes = 0
+        self.timer: Optional[TimerHandle] = None
+        # 单线程保证写入顺序
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="tailchat_event_recorder")
+        self.count = 0
+        self.closed = False
+
+    def _rotate(self):
+        self.file.close()
+        for i in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{i}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self.file = self.path.open("ab")
+        self.size = 0
+
+    def _write_records(self, records: list[bytes]):
+        try:
+            for record in records:
+                if self.size and self.size + len(record) > self.max_bytes:
+                    self._rotate()
+                self.file.write(record)
+                self.size += len(record)
+            self.file.flush()
+        except Exception as e:
+            log.warning(f"Failed to write event records: {repr(e)}")
+
+    def write(self, self_id: str, event: str, data: dict):
+        # 需要在 _handle_event 修改 data 之前调用，这里立即序列化
+        if self.closed:  # 关闭后仍可能收到事件
+            return
+        try:
+            record = self.packer.pack([time(), self_id, event, data])
+        except Exception as e:
+            log.warning(f"Failed to record event {event}: {repr(e)}")
+            return
+        self.pending.append(record)
+        self.pending_bytes += len(record)
+        self.count += 1
+        if self.pending_bytes >= self.buffer_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = get_running_loop().call_later(self.flush_interval, self.flush)
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.pending and not self.closed:
+            records, self.pending = self.pending, []
+            self.pending_bytes = 0
+            self.executor.submit(self._write_records, records)
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        self.executor.shutdown(wait=True)
+        self.file.close()
+
+
+def read_events(path: Union[str, Path]) -> Iterator[tuple[float, str, str, dict]]:
+    """逐条读取 EventRecorder 写入的记录"""
+    with Path(path).open("rb") as file:
+        for record in msgpack.Unpacker(file, ext_hook=ext_hook, raw=False, strict_map_key=False):
+            timestamp, self_id, event, data = record
+            yield timestamp, self_id, event, data
+
+
+async def replay(
+    bot: "Bot",
+    path: Union[str, Path],
+    speed: Optional[float] = 1.0,
+    self_id: Optional[str] = None,
+    handler: Optional[Callable[["Bot", str, dict], Awaitable]] = None,
+) -> int:
+    """把记录的事件按 get_event -> build -> handle_event 重新分发给 bot
+
+    :param speed: 相对原始速度的倍数，None 为不等待尽快回放
+    :param self_id: 只回放该 bot 收到的事件，None 为全部
+    :param handler: 默认为 Adapter._handle_event，事件按顺序逐个处理
+    :return: 回放的事件数
+    """
+    handler = handler or bot.adapter._handle_event
+    start = monotonic()
+    first: Optional[float] = None
+    count = 0
+    for timestamp, recorded_id, event, data in read_events(path):
+        if self_id is not None and recorded_id != self_id:
+            continue
+        if speed:
+            if first is None:
+                first = timestamp
+            delay = (timestamp - first) / speed - (monotonic() - start)
+            if delay > 0:
+                await sleep(delay)
+        try:
+            await handler(bot, event, data)
+        except Exception as e:
+            log.error(f"Error when replay event {event}: {repr(e)}")
+        count += 1
+    return count
@@ -0,0 +1,87 @@
+from asyncio import Event, Task, create_task, wait_for
+from asyncio import TimeoutError as AsyncTimeoutError
+from heapq import heappop, heappush
+from itertools import count
+from time import time
+from typing import TYPE_CHECKING, Optional
+
+from nonebot import escape_tag
+
+from .util import log
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+class TokenManager:
+    """所有 bot 共用的 jwt 续期调度器
+
+    每个 bot 的 jwt 只解析一次过期时间，在过期前 margin 秒通过 loginBot 续期，
+    所有 bot 共用一个定时堆和一个后台任务
+    """
+
+    def __init__(self, margin: float = 3600, retry_interval: float = 60):
+        self.margin = margin
+        self.retry_interval = retry_interval
+        self.heap: list[tuple[float, int, Bot]] = []
+        self.scheduled: dict[Bot, int] = {}  # bot -> 最新的序号，堆中序号不一致的条目已失效
+        self.counter = count()
+        self.wakeup = Event()
+        self.task: Optional[Task] = None
+        self.renewing: set[Task] = set()
+
+    def schedule(self, bot: "Bot", at: Optional[float] = None):
+        if not (bot.base_info.appId and bot.base_info.appSecret):
+            log.debug(f"Bot {escape_tag(str(bot))} has no appId/appSecret, jwt will not be renewed")
+            return
+        if at is None:
+            # jwt 有效期短于 margin 时不要连续续期
+            at = max(bot.jwt_expire() - self.margin, time() + self.retry_interval)
+        seq = next(self.counter)
+        self.scheduled[bot] = seq
+        heappush(self.heap, (at, seq, bot))
+        self.wakeup.set()
+        if self.task is None or self.task.done():
+            self.task = create_task(self._run(), name="tailchat_token_manager")
+
+    def cancel(self, bot: "Bot"):
+        self.scheduled.pop(bot, None)
+
+    async def _run(self):
+        while True:
+            while self.heap and self.scheduled.get(self.heap[0][2]) != self.heap[0][1]:
+                heappop(self.heap)
+            self.wakeup.clear()
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+            delay = self.heap[0][0] - time()
+            if delay > 0:
+                try:
+                    # 有新的调度时重新计算等待时间
+                    await wait_for(self.wakeup.wait(), delay)
+                except AsyncTimeoutError:
+                    pass
+                continue
+            _, _, bot = heappop(self.heap)
+            self.scheduled.pop(bot, None)
+            task = create_task(self._renew(bot))
+            task.add_done_callback(self.renewing.discard)
+            self.renewing.add(task)
+
+    async def _renew(self, bot: "Bot"):
+        try:
+            await bot.renew_token()
+        except Exception as e:
+            log.warning(f"Bot {escape_tag(str(bot))} renew jwt failed: {repr(e)}, retry in {self.retry_interval}s")
+            self.schedule(bot, time() + self.retry_interval)
+        else:
+            log.debug(f"Bot {escape_tag(str(bot))} jwt renewed")
+            self.schedule(bot)
+
+    def close(self):
+        for task in (self.task, *self.renewing):
+            if task is not None:
+                task.cancel()
+        self.heap.clear()
+        self.scheduled.clear()
@@ -0,0 +1,76 @@
+from asyncio import Event
+from enum import Enum
+from random import uniform
+from time import monotonic
+
+from .exception import DisconnectException
+from .util import log
+
+
+class ConnectionState(str, Enum):
+    IDLE = "idle"
+    AUTHENTICATING = "authenticating"  # 登录/刷新 jwt
+    CONNECTING = "connecting"  # 建立 socketio 连接
+    JOINING = "joining"  # chat.converse.findAndJoinRoom
+    READY = "ready"
+    BACKING_OFF = "backing_off"  # 等待重连
+
+
+class StateMetrics:
+    __slots__ = ("count", "total", "last")
+
+    def __init__(self):
+        self.count = 0  # 进入次数
+        self.total = 0.0  # 累计停留时间
+        self.last = 0.0  # 最近一次停留时间
+
+    def __repr__(self) -> str:
+        return f"StateMetrics(count={self.count}, total={self.total:.3f}, last={self.last:.3f})"
+
+
+class ConnectionSupervisor:
+    """单个 bot 的连接状态机
+
+    断连通过 socketio 的 disconnect 事件立即通知，重连间隔指数退避并加随机抖动
+    """
+
+    def __init__(self, name: str, backoff: float = 5, backoff_max: float = 60):
+        self.name = name
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.state = ConnectionState.IDLE
+        self.entered = monotonic()
+        self.metrics: dict[ConnectionState, StateMetrics] = {i: StateMetrics() for i in ConnectionState}
+        self.failures = 0  # 连续失败次数
+        self.disconnected = Event()
+
+    def transition(self, state: ConnectionState):
+        now = monotonic()
+        metrics = self.metrics[self.state]
+        metrics.last = now - self.entered
+        metrics.total += metrics.last
+        log.trace(f"Bot {self.name} {self.state.value} -> {state.value} ({metrics.last:.3f}s)")
+        self.state = state
+        self.entered = now
+        self.metrics[state].count += 1
+        if state == ConnectionState.CONNECTING:
+            self.disconnected.clear()
+
+    @property
+    def state_duration(self) -> float:
+        return monotonic() - self.entered
+
+    def on_disconnect(self):
+        self.disconnected.set()
+
+    async def wait_disconnect(self):
+        await self.disconnected.wait()
+        raise DisconnectException()
+
+    def next_backoff(self) -> float:
+        """连接失败或断开后的等待时间，稳定连接超过 backoff_max 后重置"""
+        if self.state == ConnectionState.READY and self.state_duration >= self.backoff_max:
+            self.failures = 0
+        delay = min(self.backoff_max, self.backoff * 2**self.failures)
+        self.failures += 1
+        return delay / 2 + uniform(0, delay / 2)
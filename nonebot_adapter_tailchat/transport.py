@@ -0,0 +1,67 @@
+from random import random
+from time import monotonic
+from typing import Literal, Optional
+
+Transport = Literal["http", "sio"]
+
+
+class TransportStats:
+    """单个通道的滑动平均延迟与错误率"""
+
+    __slots__ = ("latency", "error_rate", "samples", "updated")
+
+    def __init__(self):
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.samples = 0
+        self.updated = 0.0
+
+    def update(self, latency: float, ok: bool, alpha: float):
+        if self.samples == 0:
+            self.latency = latency
+            self.error_rate = 0.0 if ok else 1.0
+        else:
+            self.latency += alpha * (latency - self.latency)
+            self.error_rate += alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        self.samples += 1
+        self.updated = monotonic()
+
+    def current_error_rate(self, half_life: float) -> float:
+        """错误率随时间衰减，长时间未使用的故障通道会被重新尝试"""
+        return self.error_rate * 0.5 ** ((monotonic() - self.updated) / half_life)
+
+
+class TransportSelector:
+    """按接口统计 http/socketio 的延迟和错误率，选择当前更快且健康的通道"""
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        max_error_rate: float = 0.5,
+        half_life: float = 30,
+        explore: float = 0.05,
+    ):
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.half_life = half_life
+        self.explore = explore  # 只读接口随机尝试次优通道的概率，保持统计数据新鲜
+        self.stats: dict[tuple[str, Transport], TransportStats] = {}
+        self.totals: dict[Transport, TransportStats] = {}
+
+    def _score(self, api: str, transport: Transport) -> tuple[bool, float]:
+        stats: Optional[TransportStats] = self.stats.get((api, transport)) or self.totals.get(transport)
+        if stats is None:
+            return False, 0.0  # 没有数据的通道优先尝试
+        return stats.current_error_rate(self.half_life) > self.max_error_rate, stats.latency
+
+    def rank(self, api: str, *, http: bool = True, sio: bool = True, explore: bool = False) -> list[Transport]:
+        """返回按优先级排序的可用通道"""
+        transports: list[Transport] = [i for i, ok in (("http", http), ("sio", sio)) if ok]
+        transports.sort(key=lambda i: self._score(api, i))
+        if explore and len(transports) > 1 and random() < self.explore:
+            transports.reverse()
+        return transports
+
+    def record(self, api: str, transport: Transport, latency: float, ok: bool):
+        self.stats.setdefault((api, transport), TransportStats()).update(latency, ok, self.alpha)
+        self.totals.setdefault(transport, TransportStats()).update(latency, ok, self.alpha)
@@ -0,0 +1,88 @@
+import json
+from asyncio import to_thread
+from collections.abc import AsyncIterable, AsyncIterator
+from contextlib import asynccontextmanager
+from hashlib import sha256
+from os import PathLike
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from typing import IO, Optional, Union
+
+from .model import FileInfo
+from .util import log
+
+UploadFile = Union[bytes, str, PathLike, IO[bytes], AsyncIterable[bytes]]
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_SIZE = 1024 * 1024  # 异步迭代器/不可 seek 的文件超过该大小时暂存到磁盘
+
+
+def _hash_file(file: IO[bytes]) -> str:
+    digest = sha256()
+    while chunk := file.read(CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+@asynccontextmanager
+async def open_upload(file: UploadFile) -> AsyncIterator[tuple[str, Union[bytes, IO[bytes]]]]:
+    """计算文件的 sha256，返回 (digest, 可供上传的内容)，大文件不会一次性读入内存"""
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        yield sha256(file).hexdigest(), bytes(file)
+    elif isinstance(file, (str, PathLike)):
+        with open(file, "rb") as f:
+            digest = await to_thread(_hash_file, f)
+            f.seek(0)
+            yield digest, f
+    elif hasattr(file, "read") and getattr(file, "seekable", lambda: False)():
+        position = file.tell()
+        digest = await to_thread(_hash_file, file)
+        file.seek(position)
+        yield digest, file
+    else:
+        with SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+            digest = sha256()
+            if hasattr(file, "read"):
+                while chunk := file.read(CHUNK_SIZE):
+                    digest.update(chunk)
+                    spool.write(chunk)
+            else:
+                async for chunk in file:
+                    digest.update(chunk)
+                    spool.write(chunk)
+            spool.seek(0)
+            yield digest.hexdigest(), spool
+
+
+class UploadCache:
+    """文件 sha256 -> FileInfo 的缓存，设置 path 时持久化到本地"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._data: Optional[dict[str, dict]] = None
+
+    @property
+    def data(self) -> dict[str, dict]:
+        if self._data is None:
+            self._data = {}
+            if self.path is not None and self.path.exists():
+                try:
+                    self._data = json.loads(self.path.read_text(encoding="utf-8"))
+                except Exception as e:
+                    log.warning(f"Error when load upload cache {self.path}: {repr(e)}")
+        return self._data
+
+    def get(self, key: str) -> Optional[FileInfo]:
+        data = self.data.get(key)
+        return None if data is None else FileInfo.model_validate(data)
+
+    def set(self, key: str, info: FileInfo):
+        self.data[key] = info.model_dump(by_alias=True)
+        if self.path is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                temp = self.path.with_suffix(self.path.suffix + ".tmp")
+                temp.write_text(json.dumps(self.data, ensure_ascii=False), encoding="utf-8")
+                temp.replace(self.path)
+            except Exception as e:
+                log.warning(f"Error when save upload cache {self.path}: {repr(e)}")
@@ -1,14 +1,18 @@
-from asyncio import sleep
+from asyncio import Future, Task, TimerHandle, create_task, gather, get_running_loop, shield, sleep
+from collections.abc import Awaitable, Hashable
 from functools import wraps
 from io import StringIO
 from traceback import print_exc
-from typing import Any, Optional, Union
+from typing import Any, Callable, Generic, Optional, TypeVar, Union
 
 from msgpack import ExtType
 from nonebot.utils import logger_wrapper
 
 from .const import ADAPTER_NAME
 
+T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+
 EXT = {0: lambda _: int.from_bytes(_, byteorder="big")}
 
 
@@ -70,3 +74,99 @@ def retry(wait_time: int, func):
         await sleep(wait_time)
 
     return wrapper
+
+
+class SingleFlight:
+    """合并 key 相同的并发调用，共享同一次请求的结果"""
+
+    def __init__(self):
+        self.flights: dict[Hashable, Task] = {}
+        self.calls = 0  # 调用次数
+        self.collapsed = 0  # 被合并的调用次数
+
+    @staticmethod
+    def _done(task: Task):
+        if not task.cancelled():
+            task.exception()  # 避免无人等待时的 "exception was never retrieved"
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self.flights.get(key)
+        if task is None:
+            task = create_task(func())
+            self.flights[key] = task
+            task.add_done_callback(lambda _: self.flights.pop(key, None))
+            task.add_done_callback(self._done)
+        else:
+            self.collapsed += 1
+        # 单个调用者被取消时不影响其他等待者
+        return await shield(task)
+
+
+class BatchLoader(Generic[K, T]):
+    """收集 window 秒内的单个请求，合并为一次批量调用
+
+    batch 接收去重后的 key 列表，返回顺序一致的结果列表，
+    结果为异常实例时只抛给对应的调用者
+    """
+
+    def __init__(
+        self,
+        batch: Callable[[list[K]], Awaitable[list[Union[T, BaseException]]]],
+        window: float = 0,
+        max_size: int = 100,
+    ):
+        self.batch = batch
+        self.window = window
+        self.max_size = max_size
+        self.pending: dict[K, Future] = {}
+        self.timer: Optional[TimerHandle] = None
+        self.tasks: set[Task] = set()
+        self.calls = 0  # 单个请求次数
+        self.batches = 0  # 实际批量调用次数
+
+    async def load(self, key: K) -> T:
+        self.calls += 1
+        future = self.pending.get(key)
+        if future is None:
+            future = get_running_loop().create_future()
+            self.pending[key] = future
+            if len(self.pending) >= self.max_size:
+                self._flush()
+            elif self.timer is None:
+                self.timer = get_running_loop().call_later(self.window, self._flush)
+        return await shield(future)
+
+    async def load_many(self, keys: list[K]) -> list[T]:
+        return list(await gather(*(self.load(key) for key in keys)))
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        task = create_task(self._run(pending))
+        task.add_done_callback(self.tasks.discard)
+        self.tasks.add(task)
+
+    async def _run(self, pending: dict[K, Future]):
+        self.batches += 1
+        keys = list(pending)
+        try:
+            results = await self.batch(keys)
+            if len(results) != len(keys):
+                raise ValueError(f"batch returned {len(results)} results for {len(keys)} keys")
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(pending.values(), results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
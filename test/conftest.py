@@ -1,4 +1,8 @@
+import asyncio
 import os
+from collections.abc import Awaitable
+from types import SimpleNamespace
+from typing import Any, Callable
 
 import nonebot
 import pytest
@@ -6,6 +10,7 @@ from nonebug import NONEBOT_INIT_KWARGS
 
 # 导入适配器
 from nonebot_adapter_tailchat import Adapter as TailchatAdapter
+from nonebot_adapter_tailchat.bot import Bot
 
 os.environ["ENVIRONMENT"] = "test"
 
@@ -24,3 +29,52 @@ def load_bot():
     nonebot.load_plugins("plugins")
 
     return None
+
+
+class FakeBot:
+    """只替换 call_api 的 Bot，用于测试不依赖连接的 Bot 方法
+
+    接口由测试注册到 apis，调用记录在 calls 中；
+    history 为 converseId -> 按时间正序的消息，fetchConverseMessage 按 startId 每次返回 page_size 条
+    """
+
+    url = "http://127.0.0.1"
+    _fetch_converse_page = Bot._fetch_converse_page
+    iter_converse_pages = Bot.iter_converse_pages
+    iter_converse_messages = Bot.iter_converse_messages
+    upload = Bot.upload
+    broadcast = Bot.broadcast
+    _resolve_lobbies = Bot._resolve_lobbies
+
+    def __init__(self):
+        self.adapter = SimpleNamespace(upload_cache=None)
+        self.last_message_ids: dict[str, str] = {}
+        self.history: dict[str, list[dict]] = {}
+        self.page_size = 3
+        self.page_delay = 0.0
+        self.cancelled = 0  # 被取消的 fetchConverseMessage 请求数
+        self.apis: dict[str, Callable[..., Awaitable[Any]]] = {
+            "chat.message.fetchConverseMessage": self._fetch_converse_message
+        }
+        self.calls: list[tuple[str, dict]] = []
+
+    async def call_api(self, api: str, **data: Any) -> Any:
+        self.calls.append((api, data))
+        return await self.apis[api](**data)
+
+    def requests(self, api: str) -> list[dict]:
+        return [data for name, data in self.calls if name == api]
+
+    async def _fetch_converse_message(self, *, converseId: str, startId: Any = None) -> list[dict]:
+        try:
+            await asyncio.sleep(self.page_delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        messages = [i for i in self.history[converseId] if not isinstance(startId, str) or i["_id"] < startId]
+        return messages[-self.page_size :]
+
+
+@pytest.fixture
+def fake_bot() -> FakeBot:
+    return FakeBot()
@@ -0,0 +1,156 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from nonebot_adapter_tailchat import Message
+from nonebot_adapter_tailchat.const import Undefined
+from nonebot_adapter_tailchat.exception import ActionFailed
+from nonebot_adapter_tailchat.model import BroadcastTarget
+
+BASE = 1724414400
+CONVERSE_ID = "66c8a1f0e2b1a2c3d4e5f601"
+
+
+def message(index: int) -> dict:
+    return {
+        "_id": f"{BASE + index:08x}{index:016x}",
+        "content": str(index),
+        "author": "66c8a1f0e2b1a2c3d4e5f602",
+        "converseId": CONVERSE_ID,
+        "hasRecall": False,
+        "reactions": [],
+        "createdAt": (BASE + index) * 1000,
+        "updatedAt": (BASE + index) * 1000,
+        "__v": 0,
+    }
+
+
+def history_bot(bot, count: int):
+    bot.history = {CONVERSE_ID: [message(i) for i in range(count)]}
+    bot.page_delay = 0.01
+    return bot
+
+
+def page_requests(bot) -> list:
+    return [i.get("startId") for i in bot.requests("chat.message.fetchConverseMessage")]
+
+
+async def collect(bot, **kwargs) -> list[str]:
+    result = []
+    async for item in bot.iter_converse_messages(CONVERSE_ID, **kwargs):
+        result.append(item.content)
+        await asyncio.sleep(0)  # 让预取任务开始执行
+    return result
+
+
+@pytest.mark.asyncio
+async def test_iter_converse_messages(fake_bot):
+    bot = history_bot(fake_bot, 8)
+    assert await collect(bot) == [str(i) for i in range(7, -1, -1)]
+    # 8 条消息 3 页，第 4 页为空时结束
+    assert page_requests(bot) == [Undefined, message(5)["_id"], message(2)["_id"], message(0)["_id"]]
+
+
+@pytest.mark.asyncio
+async def test_iter_converse_messages_limit(fake_bot):
+    bot = history_bot(fake_bot, 8)
+    assert await collect(bot, limit=4) == ["7", "6", "5", "4"]
+    await asyncio.sleep(0.02)
+    assert len(page_requests(bot)) == 3  # 第 2 页处理时已预取第 3 页
+    assert bot.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_iter_converse_messages_since(fake_bot):
+    bot = history_bot(fake_bot, 8)
+    assert await collect(
+        bot,
+        since=datetime.fromtimestamp(BASE + 3, timezone.utc),
+        until=datetime.fromtimestamp(BASE + 6, timezone.utc),
+    ) == ["6", "5", "4", "3"]
+    await asyncio.sleep(0.02)
+    assert len(page_requests(bot)) == 3  # 遇到早于 since 的消息即停止，不再翻页
+    assert bot.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_iter_converse_messages_break(fake_bot):
+    bot = history_bot(fake_bot, 8)
+    async for item in bot.iter_converse_messages(CONVERSE_ID):
+        assert item.content == "7"
+        break
+    await asyncio.sleep(0)
+    await asyncio.sleep(0.02)
+    # 调用方提前退出时取消预取中的下一页
+    assert len(page_requests(bot)) == 2
+    assert bot.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_iter_converse_pages(fake_bot):
+    bot = history_bot(fake_bot, 5)
+    pages = [[i["content"] for i in page] async for page in bot.iter_converse_pages(CONVERSE_ID, prefetch=False)]
+    assert pages == [["4", "3", "2"], ["1", "0"]]
+    assert page_requests(bot) == [Undefined, message(2)["_id"], message(0)["_id"]]
+
+
+@pytest.mark.asyncio
+async def test_broadcast(fake_bot):
+    bot = fake_bot
+    lobby_queries = []
+    active = max_active = 0
+
+    async def getUserGroups():
+        # getUserGroups 只包含 g1，g2 通过 getGroupLobbyConverseId 获取，g3 没有大厅
+        return [
+            SimpleNamespace(
+                id="g1", panels=[SimpleNamespace(id="g1-group", type=1), SimpleNamespace(id="g1-lobby", type=0)]
+            ),
+            SimpleNamespace(id="g4", panels=[SimpleNamespace(id="g4-lobby", type=0)]),
+        ]
+
+    async def getGroupLobbyConverseId(*, groupId: str):
+        lobby_queries.append(groupId)
+        return {"g2": "g2-lobby"}.get(groupId)
+
+    async def sendMessage(*, content: str, converseId: str, groupId, meta, plain):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        try:
+            await asyncio.sleep(0.01)
+            if converseId == "fail":
+                raise ActionFailed(name="NoPermissionError", code=403)
+            return SimpleNamespace(converseId=converseId, content=content)
+        finally:
+            active -= 1
+
+    bot.getUserGroups = getUserGroups
+    bot.getGroupLobbyConverseId = getGroupLobbyConverseId
+    bot.sendMessage = sendMessage
+    targets = [
+        "c1",
+        BroadcastTarget(groupId="g1"),
+        BroadcastTarget(groupId="g2"),
+        BroadcastTarget(groupId="g3"),
+        "fail",
+        BroadcastTarget(),
+        *(f"c{i}" for i in range(2, 6)),
+    ]
+    results = await bot.broadcast(Message("hello"), targets, concurrency=2)
+
+    # 结果与 targets 顺序一致
+    assert [i.target for i in results] == [BroadcastTarget(converseId=i) if isinstance(i, str) else i for i in targets]
+    assert [i.message.converseId for i in results if i.ok] == ["c1", "g1-lobby", "g2-lobby", "c2", "c3", "c4", "c5"]
+    assert results[1].message.content == "hello"
+    assert max_active == 2
+    # getUserGroups 中没有的群组才逐个查询
+    assert sorted(lobby_queries) == ["g2", "g3"]
+
+    assert isinstance(results[3].error, ValueError)
+    assert "has no lobby" in str(results[3].error)
+    assert isinstance(results[4].error, ActionFailed)
+    assert isinstance(results[5].error, ValueError)
+    assert "requires converseId or groupId" in str(results[5].error)
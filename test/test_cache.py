@@ -0,0 +1,116 @@
+import time
+
+import pytest
+
+from nonebot_adapter_tailchat.cache import ApiCache, EventDedup, MessageCache, TTLCache
+from nonebot_adapter_tailchat.event import RemoveGroupEvent
+
+GROUP_ID = "66c8a1f0e2b1a2c3d4e5f604"
+SELF_ID = "66c8a1f0e2b1a2c3d4e5f602"
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # b 最久未使用
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    cache.set("d", None, ttl=0.01)
+    assert cache.get("d", "missing") is None
+    time.sleep(0.02)
+    assert cache.get("d", "missing") == "missing"
+    assert cache.hits == 4
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_api_cache_invalidate():
+    cache = ApiCache({"group.getGroupBasicInfo": 60})
+    basic = cache.make_key("group.getGroupBasicInfo", {"groupId": GROUP_ID})
+    other = cache.make_key("group.getGroupBasicInfo", {"groupId": "0" * 24})
+    groups = cache.make_key("group.getUserGroups", {})
+    for key in (basic, other, groups):
+        cache.set(key, {})
+
+    event = RemoveGroupEvent.model_validate(
+        {"event_name": "notify:group.remove", "self_id": SELF_ID, "groupId": GROUP_ID}
+    )
+    assert cache.invalidate_event(event) == 2
+    assert basic not in cache
+    assert groups not in cache
+    assert other in cache
+
+
+@pytest.mark.asyncio
+async def test_event_dedup():
+    dedup = EventDedup(window=0.05, max_size=16)
+    message = {"_id": "m1", "content": "hi", "updatedAt": 1}
+    assert not dedup.is_duplicate("notify:chat.message.add", message)
+    assert dedup.is_duplicate("notify:chat.message.add", dict(message))
+    # 同一条消息的编辑与回应不算重复
+    assert not dedup.is_duplicate("notify:chat.message.update", dict(message, updatedAt=2))
+    reaction = {"messageId": "m1", "reaction": {"name": ":+1:", "author": "u1"}}
+    assert not dedup.is_duplicate("notify:chat.message.addReaction", reaction)
+    assert not dedup.is_duplicate(
+        "notify:chat.message.addReaction", {"messageId": "m1", "reaction": {"name": ":+1:", "author": "u2"}}
+    )
+    assert dedup.is_duplicate("notify:chat.message.addReaction", reaction)
+    assert not dedup.is_duplicate("notify:config.updateClientConfig", {"serverName": "x"})
+    assert dedup.hits == 2
+    assert dedup.misses == 4
+    # 取消后重新添加同一回应不算重复
+    assert not dedup.is_duplicate("notify:chat.message.removeReaction", reaction)
+    assert not dedup.is_duplicate("notify:chat.message.addReaction", reaction)
+    assert not dedup.is_duplicate("notify:chat.message.removeReaction", reaction)
+    assert dedup.is_duplicate("notify:chat.message.removeReaction", reaction)
+    disabled = EventDedup()  # 默认不过滤
+    assert not disabled.is_duplicate("notify:chat.message.add", message)
+    assert not disabled.is_duplicate("notify:chat.message.add", message)
+
+    time.sleep(0.06)
+    assert not dedup.is_duplicate("notify:chat.message.add", message)
+
+
+MESSAGE = {
+    "_id": "66c8a1f0e2b1a2c3d4e5f610",
+    "content": "hello",
+    "author": SELF_ID,
+    "converseId": "66c8a1f0e2b1a2c3d4e5f611",
+    "hasRecall": False,
+    "reactions": [],
+    "createdAt": 1724414400000,
+    "updatedAt": 1724414400000,
+    "__v": 0,
+}
+
+
+@pytest.mark.asyncio
+async def test_message_cache():
+    cache = MessageCache(max_size=2)
+    cache.on_event("notify:chat.message.add", dict(MESSAGE, event_name="notify:chat.message.add", self_id=SELF_ID))
+    message = cache.get_message(MESSAGE["_id"])
+    assert message is not None
+    assert message.content == "hello"
+    assert "event_name" not in cache.get(MESSAGE["_id"])
+
+    reaction = {"name": ":+1:", "author": SELF_ID}
+    cache.on_event("notify:chat.message.addReaction", {"messageId": MESSAGE["_id"], "reaction": reaction})
+    assert [i.author for i in cache.get_message(MESSAGE["_id"]).reactions] == [SELF_ID]
+    cache.on_event("notify:chat.message.removeReaction", {"messageId": MESSAGE["_id"], "reaction": reaction})
+    assert cache.get_message(MESSAGE["_id"]).reactions == []
+
+    cache.on_event("notify:chat.message.delete", {"messageId": MESSAGE["_id"], "converseId": MESSAGE["converseId"]})
+    assert cache.get_message(MESSAGE["_id"]) is None
+
+    cache.on_api("chat.message.sendMessage", dict(MESSAGE, _id="66c8a1f0e2b1a2c3d4e5f612"))
+    cache.on_api(
+        "chat.message.fetchConverseMessage",
+        [dict(MESSAGE, _id="66c8a1f0e2b1a2c3d4e5f613"), dict(MESSAGE, _id="66c8a1f0e2b1a2c3d4e5f614")],
+    )
+    assert "66c8a1f0e2b1a2c3d4e5f612" not in cache  # 超出上限
+    assert "66c8a1f0e2b1a2c3d4e5f614" in cache
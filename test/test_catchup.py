@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+import pytest
+
+from nonebot_adapter_tailchat.catchup import catch_up
+
+
+def object_id(index: int) -> str:
+    return f"{1724414400 + index:08x}{index:016x}"
+
+
+@pytest.mark.asyncio
+async def test_catch_up(fake_bot):
+    bot = fake_bot
+    bot.history = history = {
+        converse: [{"_id": object_id(i), "converseId": converse, "content": str(i)} for i in range(10)]
+        for converse in ("c1", "c2", "c3")
+    }
+    acks = []
+
+    async def allAck():
+        return acks
+
+    async def fetchConverseLastMessages(*, converseIds: list[str]):
+        return [SimpleNamespace(converseId=i, lastMessageId=history[i][-1]["_id"]) for i in converseIds]
+
+    bot.allAck = allAck
+    bot.fetchConverseLastMessages = fetchConverseLastMessages
+    bot.last_message_ids = {"c1": object_id(2), "c2": object_id(9)}
+    # allAck 中较新的记录作为基准，只在 allAck 中的会话也会补发
+    acks[:] = [
+        SimpleNamespace(converseId="c1", lastMessageId=object_id(4)),
+        SimpleNamespace(converseId="c3", lastMessageId=object_id(7)),
+    ]
+    dispatched = []
+
+    async def dispatch(data: dict):
+        dispatched.append(data)
+
+    assert await catch_up(bot, dispatch, limit=4) == 6
+    assert all(i["replayed"] for i in dispatched)
+    replayed = {
+        converse: [i["_id"] for i in dispatched if i["converseId"] == converse] for converse in ("c1", "c2", "c3")
+    }
+    # 超过 limit 时只补发最新的 limit 条，同一会话按时间正序分发
+    assert replayed == {
+        "c1": [object_id(6), object_id(7), object_id(8), object_id(9)],  # 跨页
+        "c2": [],
+        "c3": [object_id(8), object_id(9)],
+    }
+    assert "replayed" not in history["c1"][-1]  # 不修改原始数据
+
+    # 补发时不预取，c1 跨页，c3 一页
+    assert len(bot.requests("chat.message.fetchConverseMessage")) == 3
+
+    # 没有遗漏时不翻页
+    bot.calls.clear()
+    bot.last_message_ids = {"c1": object_id(9)}
+    acks.clear()
+    assert await catch_up(bot, dispatch) == 0
+    assert bot.calls == []
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import msgpack
+import nonebot
+import pytest
+from socketio.msgpack_packet import MsgPackPacket as BaseMsgPackPacket
+
+from nonebot_adapter_tailchat import Adapter, adapter, codec
+from nonebot_adapter_tailchat.codec import MsgPackPacket
+from nonebot_adapter_tailchat.model import MessageRet
+
+TIMESTAMP = 1724414400000
+
+
+def test_msgpack_packet_ext_hook():
+    message = {
+        "_id": "66c8a1f0e2b1a2c3d4e5f601",
+        "content": "hello",
+        "author": "66c8a1f0e2b1a2c3d4e5f602",
+        "converseId": "66c8a1f0e2b1a2c3d4e5f603",
+        "hasRecall": False,
+        "reactions": [],
+        "createdAt": msgpack.ExtType(0, TIMESTAMP.to_bytes(8, "big")),
+        "updatedAt": msgpack.ExtType(0, TIMESTAMP.to_bytes(8, "big")),
+        "unknown": msgpack.ExtType(5, b"raw"),
+        "__v": 0,
+    }
+    encoded = BaseMsgPackPacket(data=["notify:chat.message.add", message]).encode()
+
+    packet = MsgPackPacket(encoded_packet=encoded)
+    data = packet.data[1]
+    assert data["createdAt"] == TIMESTAMP
+    assert data["unknown"] == msgpack.ExtType(5, b"raw")  # 未知的 ext 类型原样保留
+    assert MessageRet.model_validate(data).createdAt == datetime(2024, 8, 23, 12, tzinfo=timezone.utc)
+
+
+def test_get_codec(monkeypatch):
+    for name in ("orjson", "msgspec", "json"):
+        try:
+            json_codec = codec.get_codec(name)
+        except ImportError:  # 指定的编解码器未安装时不回退
+            continue
+        assert json_codec.name == name
+        assert json_codec.loads(json_codec.dumps({"a": [1, "中文"]})) == {"a": [1, "中文"]}
+        with pytest.raises(json_codec.errors):
+            json_codec.loads(b"{bad")
+
+    def missing():
+        raise ImportError()
+
+    # auto 依次尝试，未安装的跳过
+    monkeypatch.setitem(codec.CODECS, "orjson", missing)
+    monkeypatch.setitem(codec.CODECS, "msgspec", missing)
+    assert codec.get_codec().name == "json"
+    monkeypatch.setitem(codec.CODECS, "orjson", lambda: codec.JsonCodec("fake", str, str.encode))
+    assert codec.get_codec().name == "fake"
+
+
+def test_loads_error(monkeypatch):
+    class DecodeError(Exception):  # 与 msgspec.DecodeError 一样不是 ValueError 子类
+        pass
+
+    def loads(data):
+        raise DecodeError()
+
+    logs = []
+    tailchat = nonebot.get_adapter(Adapter)
+    monkeypatch.setattr(tailchat, "codec", codec.JsonCodec("fake", loads, str.encode, (DecodeError,)))
+    monkeypatch.setattr(adapter, "log", SimpleNamespace(error=lambda *args: logs.append(args)))
+    with pytest.raises(DecodeError):
+        tailchat._loads(b"<html>")
+    assert logs == [("Error when loads data", "\\<html>")]
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+import pytest
+
+from nonebot_adapter_tailchat import Message
+from nonebot_adapter_tailchat.cache import MessageCache
+from nonebot_adapter_tailchat.event import (
+    AtMessageEvent,
+    DefaultReactionAddEvent,
+    GroupReactionAddEvent,
+    MessageAddEvent,
+)
+from nonebot_adapter_tailchat.model import MessageRet
+
+SELF_ID = "66c8a1f0e2b1a2c3d4e5f601"
+MESSAGE = {
+    "event_name": "notify:chat.message.add",
+    "self_id": SELF_ID,
+    "_id": "66c8a1f0e2b1a2c3d4e5f602",
+    "author": "66c8a1f0e2b1a2c3d4e5f603",
+    "hasRecall": False,
+    "converseId": "66c8a1f0e2b1a2c3d4e5f604",
+    "groupId": "66c8a1f0e2b1a2c3d4e5f605",
+    "reactions": [],
+    "createdAt": 1724414400000,
+    "updatedAt": 1724414400000,
+}
+BOT = SimpleNamespace(config=SimpleNamespace(nickname={"bot"}))
+
+
+@pytest.mark.asyncio
+async def test_lazy_message():
+    event = await MessageAddEvent.build(BOT, dict(MESSAGE, content="hello [b]world[/b]"))
+    assert "content" not in event.__dict__  # 未访问时不解析
+    assert event.get_log_string().endswith(" hello [b]world[/b]")
+    assert "content" not in event.__dict__  # 输出日志不解析
+    assert event.get_message() == Message("hello [b]world[/b]")
+    assert event.content is event.get_message()
+    assert event.model_dump(by_alias=True)["content"] == "hello [b]world[/b]"
+
+    # 开头是 at 或昵称时构建事件时解析并去掉
+    event = await MessageAddEvent.build(BOT, dict(MESSAGE, content=f"[at={SELF_ID}]bot[/at] ping"))
+    assert event._isToMe
+    assert event.get_plaintext() == " ping"
+    event = await MessageAddEvent.build(BOT, dict(MESSAGE, content="bot ping"))
+    assert event._isToMe
+    assert event.get_plaintext() == " ping"
+
+    event = await MessageAddEvent.build(BOT, dict(MESSAGE, content="<r>red</r>"))
+    assert event.get_log_string().endswith(r" \<r>red\</r>")  # 日志中转义颜色标签
+
+
+@pytest.mark.asyncio
+async def test_lazy_payload():
+    event = await AtMessageEvent.build(
+        BOT,
+        {
+            "event_name": "notify:chat.inbox.append",
+            "self_id": SELF_ID,
+            "type": "message",
+            "__v": 0,
+            "_id": "66c8a1f0e2b1a2c3d4e5f606",
+            "userId": SELF_ID,
+            "payload": {
+                "converseId": MESSAGE["converseId"],
+                "messageId": MESSAGE["_id"],
+                "messageAuthor": MESSAGE["author"],
+                "messageSnippet": "hi [b]there[/b]",
+                "messagePlainContent": "hi",
+            },
+            "readed": False,
+            "createdAt": 1724414400000,
+            "updatedAt": 1724414400000,
+        },
+    )
+    assert "messagePlainContent" not in event.payload.__dict__
+    assert event.get_log_string().endswith(" hi [b]there[/b]")
+    assert "messageSnippet" not in event.payload.__dict__
+    assert event.payload.messagePlainContent == Message("hi")
+    assert event.get_message() == Message("hi [b]there[/b]")
+
+
+@pytest.mark.asyncio
+async def test_reaction_from_message_cache():
+    async def getMessage(**_):
+        raise AssertionError("should not call getMessage")
+
+    bot = SimpleNamespace(config=BOT.config, message_cache=MessageCache(), getMessage=getMessage)
+    bot.message_cache.on_event("notify:chat.message.add", dict(MESSAGE, content="hello", __v=0, author=SELF_ID))
+    event = await DefaultReactionAddEvent.build(
+        bot,
+        {
+            "event_name": "notify:chat.message.addReaction",
+            "self_id": SELF_ID,
+            "converseId": MESSAGE["converseId"],
+            "messageId": MESSAGE["_id"],
+            "reaction": {"name": ":+1:", "author": MESSAGE["author"]},
+        },
+    )
+    assert isinstance(event, GroupReactionAddEvent)
+    assert event.get_message() == Message("hello")
+    assert event.is_tome()
+    # 转换为子类时不重新校验，结果与重新校验一致
+    assert event.model_dump() == GroupReactionAddEvent.model_validate(dict(event)).model_dump()
+
+
+@pytest.mark.asyncio
+async def test_reaction_cache_invalid():
+    called = []
+
+    async def getMessage(**kwargs):
+        called.append(kwargs)
+        return MessageRet.model_validate(dict(MESSAGE, content="hello", __v=0, author=SELF_ID))
+
+    bot = SimpleNamespace(config=BOT.config, message_cache=MessageCache(), getMessage=getMessage)
+    # 消息事件中没有 __v，缓存的数据不能校验为 MessageRet 时回退到 getMessage
+    bot.message_cache.on_event("notify:chat.message.add", dict(MESSAGE, content="hello", author=SELF_ID))
+    event = await DefaultReactionAddEvent.build(
+        bot,
+        {
+            "event_name": "notify:chat.message.addReaction",
+            "self_id": SELF_ID,
+            "converseId": MESSAGE["converseId"],
+            "messageId": MESSAGE["_id"],
+            "reaction": {"name": ":+1:", "author": MESSAGE["author"]},
+        },
+    )
+    assert len(called) == 1
+    assert MESSAGE["_id"] not in bot.message_cache
+    assert isinstance(event, GroupReactionAddEvent)
+    assert event.is_tome()
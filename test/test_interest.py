@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import pytest
+
+from nonebot_adapter_tailchat import interest
+from nonebot_adapter_tailchat.interest import EventFilter
+
+
+@pytest.mark.asyncio
+async def test_event_filter(monkeypatch: pytest.MonkeyPatch):
+    fake_matchers = {1: [SimpleNamespace(type="message")]}
+    monkeypatch.setattr(interest, "matchers", fake_matchers)
+
+    event_filter = EventFilter(allow={"notify:chat.message.addReaction"}, deny={"notify:chat.inbox.append"})
+    assert event_filter.interested("notify:chat.message.add")
+    assert not event_filter.interested("notify:chat.message.delete")  # notice
+    assert not event_filter.interested("notify:friend.request.add")  # request
+    assert not event_filter.interested("notify:unknown")
+    assert event_filter.interested("notify:chat.message.addReaction")  # 白名单
+    assert not event_filter.interested("notify:chat.inbox.append")  # 黑名单
+    assert event_filter.interested("notify:group.updateInfo")  # 适配器需要处理
+    assert event_filter.passed == 3
+    assert event_filter.skipped == 4
+
+    fake_matchers[1].append(SimpleNamespace(type="notice"))  # 新增事件响应器后重新计算
+    assert event_filter.interested("notify:chat.message.delete")
+    fake_matchers[2] = [SimpleNamespace(type="")]
+    assert event_filter.interested("notify:unknown")
+    assert not event_filter.interested("notify:chat.inbox.append")
+
+    deny_only = EventFilter(deny={"notify:chat.inbox.append"}, by_matchers=False)
+    assert deny_only.interested("notify:unknown")
+    assert not deny_only.interested("notify:chat.inbox.append")
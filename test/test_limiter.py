@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+import pytest
+
+from nonebot_adapter_tailchat.limiter import SendQueue, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_token_bucket():
+    bucket = TokenBucket(rate=100, capacity=2)
+    start = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    # 2 个突发 + 2 个等待 1/100 秒
+    assert 0.015 <= time.monotonic() - start < 0.1
+
+
+@pytest.mark.asyncio
+async def test_send_queue():
+    queue = SendQueue(concurrency=2)
+    sent = []
+    running = 0
+    max_running = 0
+
+    def send(converseId: str, index: int):
+        async def _send():
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01 if index % 2 else 0.001)
+            sent.append((converseId, index))
+            running -= 1
+            return index
+
+        return queue.submit(converseId, None, _send)
+
+    results = await asyncio.gather(*(send(c, i) for i in range(4) for c in ("a", "b", "c")))
+    assert results == [i for i in range(4) for _ in range(3)]
+    for converseId in ("a", "b", "c"):
+        assert [i for c, i in sent if c == converseId] == [0, 1, 2, 3]  # 会话内有序
+    assert max_running == 2
+    assert not queue.workers
+    assert len(queue) == 0
+
+    async def fail():
+        raise ValueError("fail")
+
+    with pytest.raises(ValueError):
+        await queue.submit("a", None, fail)
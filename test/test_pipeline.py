@@ -0,0 +1,149 @@
+import asyncio
+
+import nonebot
+import pytest
+
+from nonebot_adapter_tailchat import Adapter, Bot, adapter
+from nonebot_adapter_tailchat.config import BotInfo
+from nonebot_adapter_tailchat.pipeline import EventPipeline
+
+LOW = "notify:chat.message.addReaction"
+ADD = "notify:chat.message.add"
+
+
+@pytest.mark.asyncio
+async def test_pipeline_block():
+    handled = []
+    release = asyncio.Event()
+
+    async def handler(bot, event, data):
+        await release.wait()
+        handled.append(data["i"])
+
+    pipeline = EventPipeline(handler, workers=1, max_size=2)
+    pipeline.start()
+    for i in range(3):
+        await pipeline.put(None, ADD, {"i": i})
+    await asyncio.sleep(0)  # worker 取走第一个事件
+    assert pipeline.depth == 2
+    blocked = asyncio.create_task(pipeline.put(None, ADD, {"i": 3}))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    release.set()
+    await blocked
+    while pipeline.depth:
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.001)
+    assert handled == [0, 1, 2, 3]
+    assert pipeline.metrics.processed == 4
+    assert pipeline.metrics.dropped == 0
+    assert pipeline.metrics.wait_max > 0
+    await pipeline.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("overflow", "events", "expected"),
+    [
+        ("drop_oldest", [ADD, ADD, ADD], [1, 2]),
+        ("drop_low_priority", [ADD, LOW, ADD], [0, 2]),
+        ("drop_low_priority", [ADD, ADD, LOW], [0, 1]),
+    ],
+)
+async def test_pipeline_drop(overflow, events, expected):
+    handled = []
+
+    async def handler(bot, event, data):
+        handled.append(data["i"])
+
+    pipeline = EventPipeline(handler, workers=1, max_size=2, overflow=overflow, low_priority={LOW})
+    for i, event in enumerate(events):  # 未启动 worker，队列不会被消费
+        await pipeline.put(None, event, {"i": i})
+    assert pipeline.depth == 2
+    assert pipeline.metrics.dropped == 1
+    pipeline.start()
+    while pipeline.depth:
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.001)
+    assert handled == expected
+    await pipeline.close()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_ordered():
+    handled = []
+    running = set()
+    max_running = 0
+
+    async def handler(bot, event, data):
+        nonlocal max_running
+        converse = data["converseId"]
+        assert converse not in running  # 同一会话不会并行处理
+        running.add(converse)
+        max_running = max(max_running, len(running))
+        await asyncio.sleep(0.005 if converse == "hot" else 0.001)
+        handled.append((converse, data["i"]))
+        running.discard(converse)
+
+    pipeline = EventPipeline(handler, workers=3, max_size=64)
+    for i in range(10):
+        await pipeline.put(None, ADD, {"converseId": "hot", "i": i})
+    for i in range(3):
+        await pipeline.put(None, ADD, {"converseId": "dm", "i": i})
+    pipeline.start()
+    while pipeline.depth or pipeline.running:
+        await asyncio.sleep(0.001)
+    await pipeline.close()
+
+    assert [i for c, i in handled if c == "hot"] == list(range(10))
+    assert [i for c, i in handled if c == "dm"] == list(range(3))
+    assert max_running == 2
+    # 安静的会话不会被繁忙的会话阻塞
+    assert handled.index(("dm", 2)) < handled.index(("hot", 3))
+
+
+@pytest.mark.asyncio
+async def test_catch_up_through_pipeline(monkeypatch):
+    tailchat = nonebot.get_adapter(Adapter)
+    bot = Bot(tailchat, "66c8a1f0e2b1a2c3d4e5f601", BotInfo(url="http://127.0.0.1"))
+    queued = []
+
+    class Pipeline:
+        async def put(self, bot, event, data):
+            queued.append((event, data["_id"], data["replayed"]))
+
+    async def catch_up(bot, dispatch, concurrency, limit):
+        for i in ("m1", "m2"):
+            await dispatch({"_id": i, "converseId": "c1", "replayed": True})
+
+    monkeypatch.setattr(tailchat, "pipeline", Pipeline())
+    monkeypatch.setattr(adapter, "catch_up", catch_up)
+    await tailchat._catch_up(bot)
+    # 补发的消息与收到的消息一样进入事件队列并写入消息缓存
+    assert queued == [(ADD, "m1", True), (ADD, "m2", True)]
+    assert "m1" in bot.message_cache
+
+
+@pytest.mark.asyncio
+async def test_pipeline_closed():
+    release = asyncio.Event()
+
+    async def handler(bot, event, data):
+        await release.wait()
+
+    pipeline = EventPipeline(handler, workers=1, max_size=1)
+    pipeline.start()
+    await pipeline.put(None, ADD, {"i": 0})
+    await asyncio.sleep(0)
+    await pipeline.put(None, ADD, {"i": 1})
+    blocked = asyncio.create_task(pipeline.put(None, ADD, {"i": 2}))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    # 关闭时唤醒阻塞的 put，关闭后的事件直接丢弃
+    await pipeline.close()
+    await asyncio.wait_for(blocked, 1)
+    await asyncio.wait_for(pipeline.put(None, ADD, {"i": 3}), 1)
+    assert pipeline.depth == 0
+    assert not pipeline.shards
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from nonebot_adapter_tailchat.exception import ActionFailed, CircuitOpenError
+from nonebot_adapter_tailchat.policy import CircuitBreaker, RetryPolicy
+
+
+@pytest.mark.asyncio
+async def test_retry_policy():
+    policy = RetryPolicy(times=3, backoff=0.001)
+    count = 0
+
+    async def flaky():
+        nonlocal count
+        count += 1
+        if count < 3:
+            raise ConnectionError("reset")
+        return count
+
+    assert await policy.call("user.whoami", flaky) == 3
+    assert policy.retries == 2
+
+    # 非幂等接口不重试
+    count = 0
+    with pytest.raises(ConnectionError):
+        await policy.call("chat.message.sendMessage", flaky)
+    assert count == 1
+
+    # 业务错误不重试
+    async def not_found():
+        nonlocal count
+        count += 1
+        raise ActionFailed(name="DataNotFoundError", code=404)
+
+    count = 0
+    with pytest.raises(ActionFailed):
+        await policy.call("user.whoami", not_found)
+    assert count == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    policy = RetryPolicy()
+
+    async def down():
+        raise TimeoutError()
+
+    async def up():
+        return True
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            await policy.call("user.whoami", down, breaker)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        await policy.call("user.whoami", up, breaker)
+    assert breaker.rejected == 1
+
+    breaker.opened_at -= 60  # 进入半开状态
+    assert await policy.call("user.whoami", up, breaker)
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_probe_cancelled():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    policy = RetryPolicy()
+
+    async def down():
+        raise TimeoutError()
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def up():
+        return True
+
+    with pytest.raises(TimeoutError):
+        await policy.call("user.whoami", down, breaker)
+    breaker.opened_at -= 60
+    # 探测请求被外层超时取消，不能一直占用探测名额
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(policy.call("user.whoami", hang, breaker), 0.01)
+    assert breaker.state == "half_open"
+    assert breaker.probes == 0
+    assert await policy.call("user.whoami", up, breaker)
+    assert breaker.state == "closed"
@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+import msgpack
+import pytest
+
+from nonebot_adapter_tailchat.record import EventRecorder, read_events, replay
+
+
+@pytest.mark.asyncio
+async def test_recorder_rotate(tmp_path):
+    path = tmp_path / "events.msgpack"
+    recorder = EventRecorder(path, max_bytes=200, backups=2, buffer_size=150)
+    for i in range(20):
+        data = {"_id": str(i), "content": "x" * 20, "createdAt": msgpack.ExtType(0, b"\x00" * 8)}
+        recorder.write("bot", "notify:chat.message.add", data)
+        data["event_name"] = "changed"  # 写入后修改不影响记录
+    recorder.close()
+
+    assert sorted(i.name for i in tmp_path.iterdir()) == ["events.msgpack", "events.msgpack.1", "events.msgpack.2"]
+    assert all(i.stat().st_size <= 200 for i in tmp_path.iterdir())
+    records = list(read_events(path))
+    assert records[-1][1:3] == ("bot", "notify:chat.message.add")
+    assert records[-1][3]["_id"] == "19"
+    assert records[-1][3]["createdAt"] == 0  # 按 socketio 相同的方式解码 ext
+    assert "event_name" not in records[-1][3]
+
+
+@pytest.mark.asyncio
+async def test_replay(tmp_path):
+    path = tmp_path / "events.msgpack"
+    recorder = EventRecorder(path, flush_interval=0.01)
+    for i in range(3):
+        recorder.write("bot" if i < 2 else "other", f"event{i}", {"index": i})
+    assert path.stat().st_size == 0
+    await asyncio.sleep(0.05)  # 定时写入
+    assert not recorder.pending
+    recorder.executor.submit(lambda: None).result()  # 等待写入线程
+    assert len(list(read_events(path))) == 3
+    recorder.close()
+
+    received = []
+
+    async def handler(bot, event, data):
+        received.append((event, data["index"]))
+
+    bot = SimpleNamespace(adapter=SimpleNamespace(_handle_event=handler))
+    assert await replay(bot, path, speed=None, self_id="bot") == 2
+    assert received == [("event0", 0), ("event1", 1)]
+
+    received.clear()
+    assert await replay(bot, path, speed=100, handler=handler) == 3
+    assert [i[1] for i in received] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_recorder_closed(tmp_path):
+    path = tmp_path / "events.msgpack"
+    recorder = EventRecorder(path, flush_interval=0.01)
+    recorder.write("bot", "event0", {"index": 0})
+    recorder.close()
+    # 关闭后收到的事件和定时写入都被忽略
+    recorder.write("bot", "event1", {"index": 1})
+    recorder.flush()
+    await asyncio.sleep(0.02)
+    recorder.close()
+    assert [i[2] for i in read_events(path)] == ["event0"]
@@ -0,0 +1,56 @@
+import asyncio
+from time import time
+from types import SimpleNamespace
+
+import pytest
+
+from nonebot_adapter_tailchat.renewal import TokenManager
+
+
+class RenewalBot:
+    def __init__(self, lifetime: float, failures: int = 0):
+        self.base_info = SimpleNamespace(appId="app", appSecret="secret")
+        self.lifetime = lifetime
+        self.expire = time() + lifetime
+        self.failures = failures
+        self.renewed = 0
+
+    def jwt_expire(self) -> float:
+        return self.expire
+
+    async def renew_token(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("reset")
+        self.renewed += 1
+        self.expire = time() + self.lifetime
+
+
+@pytest.mark.asyncio
+async def test_token_manager():
+    manager = TokenManager(margin=1, retry_interval=0.05)
+    bot = RenewalBot(lifetime=1.1, failures=1)
+    manager.schedule(bot)
+    # 过期前 margin 秒续期，失败后 retry_interval 秒重试，成功后按新的过期时间重新调度
+    await asyncio.sleep(0.07)
+    assert (bot.failures, bot.renewed) == (1, 0)
+    await asyncio.sleep(0.05)
+    assert (bot.failures, bot.renewed) == (0, 0)
+    await asyncio.sleep(0.08)
+    assert bot.renewed == 1
+    assert bot in manager.scheduled
+    assert manager.heap[-1][0] == pytest.approx(bot.expire - 1)
+
+    # 取消后不再续期，堆中的旧条目被跳过
+    manager.cancel(bot)
+    renewed = bot.renewed
+    await asyncio.sleep(0.15)
+    assert bot.renewed == renewed
+    assert not manager.heap
+
+    # 没有 appId/appSecret 的 bot 不调度
+    manager.schedule(SimpleNamespace(base_info=SimpleNamespace(appId=None, appSecret=None)))
+    assert not manager.scheduled
+    manager.close()
+    await asyncio.sleep(0)
+    assert manager.task.cancelled()
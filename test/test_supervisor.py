@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from nonebot_adapter_tailchat.exception import DisconnectException
+from nonebot_adapter_tailchat.supervisor import ConnectionState, ConnectionSupervisor
+
+
+@pytest.mark.asyncio
+async def test_next_backoff():
+    supervisor = ConnectionSupervisor("bot", backoff=1, backoff_max=8)
+    # 指数增长到 backoff_max，抖动范围为 [delay/2, delay]
+    for _ in range(50):
+        supervisor.failures = 0
+        delays = [supervisor.next_backoff() for _ in range(6)]
+        for delay, expected in zip(delays, (1, 2, 4, 8, 8, 8)):
+            assert expected / 2 <= delay <= expected
+    assert supervisor.failures == 6
+
+    # READY 状态下连接不够稳定时不重置
+    supervisor.transition(ConnectionState.READY)
+    assert supervisor.next_backoff() >= 4
+    # 稳定连接超过 backoff_max 后重置
+    supervisor.transition(ConnectionState.READY)
+    supervisor.entered -= 8
+    assert supervisor.next_backoff() <= 1
+    assert supervisor.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_disconnect():
+    supervisor = ConnectionSupervisor("bot")
+    supervisor.transition(ConnectionState.CONNECTING)
+    supervisor.on_disconnect()  # 在等待之前就已断开
+    with pytest.raises(DisconnectException):
+        await asyncio.wait_for(supervisor.wait_disconnect(), 0.1)
+
+    # 重新连接时清除断开标记
+    supervisor.transition(ConnectionState.CONNECTING)
+    waiting = asyncio.create_task(supervisor.wait_disconnect())
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+    supervisor.on_disconnect()
+    with pytest.raises(DisconnectException):
+        await asyncio.wait_for(waiting, 0.1)
+
+
+@pytest.mark.asyncio
+async def test_state_metrics():
+    supervisor = ConnectionSupervisor("bot")
+    for state in (
+        ConnectionState.AUTHENTICATING,
+        ConnectionState.CONNECTING,
+        ConnectionState.JOINING,
+        ConnectionState.READY,
+    ):
+        supervisor.transition(state)
+    await asyncio.sleep(0.02)
+    supervisor.transition(ConnectionState.BACKING_OFF)
+    supervisor.transition(ConnectionState.AUTHENTICATING)
+
+    metrics = supervisor.metrics
+    assert supervisor.state == ConnectionState.AUTHENTICATING
+    assert metrics[ConnectionState.AUTHENTICATING].count == 2
+    assert metrics[ConnectionState.READY].count == 1
+    assert metrics[ConnectionState.IDLE].count == 0
+    assert metrics[ConnectionState.READY].last >= 0.02
+    assert metrics[ConnectionState.READY].total == metrics[ConnectionState.READY].last
+    assert metrics[ConnectionState.JOINING].last < 0.02
+    assert supervisor.state_duration < 0.02
@@ -0,0 +1,60 @@
+import nonebot
+import pytest
+
+from nonebot_adapter_tailchat import Adapter, Bot
+from nonebot_adapter_tailchat.config import BotInfo
+from nonebot_adapter_tailchat.transport import TransportSelector
+
+
+@pytest.mark.asyncio
+async def test_transport_selector():
+    selector = TransportSelector(explore=0)
+    assert selector.rank("user.whoami", sio=False) == ["http"]
+
+    selector.record("user.whoami", "http", 0.05, True)
+    selector.record("user.whoami", "sio", 0.01, True)
+    assert selector.rank("user.whoami") == ["sio", "http"]
+    # 没有数据的接口使用通道总体统计
+    assert selector.rank("chat.message.getMessage") == ["sio", "http"]
+
+    for _ in range(5):
+        selector.record("user.whoami", "sio", 0.01, False)
+    assert selector.rank("user.whoami") == ["http", "sio"]
+
+    # 错误率随时间衰减后重新尝试
+    selector.stats["user.whoami", "sio"].updated -= 300
+    assert selector.rank("user.whoami") == ["sio", "http"]
+
+
+@pytest.mark.asyncio
+async def test_pinned_transport(monkeypatch):
+    tailchat = nonebot.get_adapter(Adapter)
+    bot = Bot(tailchat, "66c8a1f0e2b1a2c3d4e5f601", BotInfo(url="http://127.0.0.1"))
+    calls = []
+
+    async def request_http(bot, api, data, use_api):
+        calls.append((api, "http"))
+        return {"data": None}
+
+    async def request_sio(bot, api, data):
+        calls.append((api, "sio"))
+        return {"data": None}
+
+    monkeypatch.setattr(tailchat.adapter_config, "adaptive_transport", True)
+    monkeypatch.setattr(tailchat, "is_http_client_driver", True)
+    monkeypatch.setattr(tailchat, "_request_http", request_http)
+    monkeypatch.setattr(tailchat, "_request_sio", request_sio)
+
+    await tailchat._request_api(bot, "user.whoami")
+    assert calls == [("user.whoami", "http")]
+    assert selector_apis(bot) == {"user.whoami"}
+
+    # 指定了通道的接口(loginBot/upload)不参与选择，也不计入统计
+    await tailchat._request_api(bot, "openapi.bot.login", use_http_=True, use_sio_=False)
+    await tailchat._request_api(bot, "upload", kvs_={}, use_api_=False, use_http_=True, use_sio_=False)
+    assert calls[1:] == [("openapi.bot.login", "http"), ("upload", "http")]
+    assert selector_apis(bot) == {"user.whoami"}
+
+
+def selector_apis(bot: Bot) -> set[str]:
+    return {api for api, _ in bot.transport.stats}
@@ -0,0 +1,75 @@
+import io
+from hashlib import sha256
+
+import pytest
+
+from nonebot_adapter_tailchat.upload import CHUNK_SIZE, UploadCache, open_upload
+
+CONTENT = bytes(range(256)) * (CHUNK_SIZE // 128 + 1)  # 超过一个分块
+
+
+class Unseekable(io.RawIOBase):
+    def __init__(self, data: bytes):
+        self.stream = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self.stream.read(size)
+
+
+async def chunks(data: bytes):
+    for i in range(0, len(data), 1000):
+        yield data[i : i + 1000]
+
+
+def read(content) -> bytes:
+    return content if isinstance(content, bytes) else content.read()
+
+
+@pytest.mark.asyncio
+async def test_open_upload(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(CONTENT)
+    seekable = io.BytesIO(b"skip" + CONTENT)
+    seekable.seek(4)  # 从当前位置开始计算和上传
+    expected = sha256(CONTENT).hexdigest()
+    for file in (CONTENT, str(path), path, seekable, Unseekable(CONTENT), chunks(CONTENT)):
+        async with open_upload(file) as (digest, content):
+            assert digest == expected
+            assert read(content) == CONTENT
+
+
+async def upload_api(*, kvs_: dict, **_) -> dict:
+    name, content, _ = kvs_["files"]["file"]
+    assert read(content) in (CONTENT, b"other")  # 流式上传完整的文件内容
+    return {"etag": "etag", "path": f"files/{name}", "url": f"http://127.0.0.1/files/{name}"}
+
+
+def uploaded(bot) -> list[str]:
+    return [i["kvs_"]["files"]["file"][0] for i in bot.requests("upload")]
+
+
+@pytest.mark.asyncio
+async def test_upload_cache(tmp_path, fake_bot):
+    path = tmp_path / "file.bin"
+    path.write_bytes(CONTENT)
+    cache_file = tmp_path / "cache" / "upload.json"
+
+    bot = fake_bot
+    bot.apis["upload"] = upload_api
+    bot.adapter.upload_cache = UploadCache(cache_file)
+    info = await bot.upload(file=path)
+    assert uploaded(bot) == ["file.bin"]
+    # 内容相同的文件不再上传，与输入类型无关
+    assert await bot.upload(file=chunks(CONTENT), filename="other.bin") == info
+    assert uploaded(bot) == ["file.bin"]
+
+    # 缓存持久化到文件
+    bot.calls.clear()
+    bot.adapter.upload_cache = UploadCache(cache_file)
+    assert await bot.upload(file=CONTENT, filename="file.bin") == info
+    assert uploaded(bot) == []
+    await bot.upload(file=b"other", filename="other.bin")
+    assert uploaded(bot) == ["other.bin"]
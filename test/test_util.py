@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from nonebot_adapter_tailchat.util import BatchLoader, SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight():
+    flight = SingleFlight()
+    count = 0
+
+    async def fetch():
+        nonlocal count
+        count += 1
+        await asyncio.sleep(0.01)
+        return count
+
+    assert await asyncio.gather(*(flight.do("key", fetch) for _ in range(5))) == [1] * 5
+    assert count == 1
+    assert flight.calls == 5
+    assert flight.collapsed == 4
+    assert not flight.flights
+
+    # 结束后不再共享
+    assert await flight.do("key", fetch) == 2
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("fail")
+
+    results = await asyncio.gather(*(flight.do("fail", fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(i, ValueError) for i in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_loader():
+    batches = []
+
+    async def batch(keys: list[int]):
+        batches.append(keys)
+        return [ValueError(i) if i < 0 else i * 2 for i in keys]
+
+    loader = BatchLoader(batch, window=0.01, max_size=3)
+    assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1)) == [2, 4, 2]
+    assert batches == [[1, 2]]
+
+    assert await loader.load_many([3, 4, 5, 6]) == [6, 8, 10, 12]
+    assert batches[1:] == [[3, 4, 5], [6]]  # 超过 max_size 立即发送
+
+    results = await asyncio.gather(loader.load(-1), loader.load(7), return_exceptions=True)
+    assert isinstance(results[0], ValueError)
+    assert results[1] == 14
+    assert loader.calls == 9
+    assert loader.batches == 4